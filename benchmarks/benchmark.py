@@ -0,0 +1,382 @@
+"""
+Benchmarks dos caminhos críticos: leitura das planilhas, estatísticas,
+geração, preço, banco de dados e checagem de atualização.
+
+Cada medição roda algumas rodadas e guarda mínimo, média, mediana e desvio
+em um JSON, que pode ser comparado com o de outra versão.
+
+Exemplos (a partir da raiz do projeto):
+    poetry run python benchmarks/benchmark.py
+    poetry run python benchmarks/benchmark.py -k banco --tamanhos 1000 100000
+    poetry run python benchmarks/benchmark.py --comparar benchmarks/benchmark-1.0.65.json
+
+Sem --saida, o JSON vai para benchmarks/benchmark-<versão>.json (ignorado pelo git).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PASTA, "..", "src"))
+
+import numpy as np
+
+from config import LOTTERY_CONFIG, VERSION
+from generator import GeradorJogos, METODOS
+
+# Regressão acima deste fator em relação à base faz o --comparar falhar
+LIMITE_REGRESSAO = 1.25
+TAMANHOS_HISTORICO = (1_000, 100_000, 1_000_000)
+
+
+class Benchmark:
+    """Executa e registra as medições, no estilo do pytest-benchmark"""
+
+    def __init__(self, filtro=None, rodadas=5):
+        self.filtro = filtro
+        self.rodadas = rodadas
+        self.resultados = []
+
+    def quer(self, *nomes):
+        """Se algum dos benchmarks passa pelo filtro -k"""
+        return not self.filtro or any(self.filtro in nome for nome in nomes)
+
+    def medir(self, nome, funcao, rodadas=None, preparar=None):
+        """Mede funcao(); preparar(), se houver, roda antes de cada rodada sem ser medido"""
+        if not self.quer(nome):
+            return
+        tempos = []
+        for _ in range(rodadas or self.rodadas):
+            argumento = preparar() if preparar else None
+            inicio = time.perf_counter()
+            funcao(argumento) if preparar else funcao()
+            tempos.append(time.perf_counter() - inicio)
+        resultado = {
+            "nome": nome,
+            "rodadas": len(tempos),
+            "min": min(tempos),
+            "max": max(tempos),
+            "media": statistics.fmean(tempos),
+            "mediana": statistics.median(tempos),
+            "desvio": statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+        }
+        self.resultados.append(resultado)
+        print(f"{nome:<50} {resultado['mediana'] * 1000:>12.3f} ms", file=sys.stderr)
+
+
+# DADOS E ESTATÍSTICAS
+# ===================================================================
+def bench_dados(b, pasta):
+    from draws import DrawCache
+    from stats import StatsStore
+    from utils import get_resource_path
+
+    cache_dir = os.path.join(pasta, "sorteios")
+    for loteria, config in LOTTERY_CONFIG.items():
+        nomes = [
+            f"dados.{nome}[{loteria}]"
+            for nome in ("compilar_xlsx", "carregar_cache", "estatisticas")
+        ]
+        if not b.quer(*nomes):
+            continue
+        caminho = get_resource_path(config["caminho_xlsx"])
+        b.medir(
+            f"dados.compilar_xlsx[{loteria}]",
+            lambda: DrawCache(cache_dir)._compilar(caminho, config),
+            rodadas=3,
+        )
+        DrawCache(cache_dir).carregar(loteria)
+        b.medir(
+            f"dados.carregar_cache[{loteria}]",
+            lambda: DrawCache(cache_dir).carregar(loteria),
+        )
+        sorteios = DrawCache(cache_dir).carregar(loteria)
+        b.medir(
+            f"dados.estatisticas[{loteria}]",
+            lambda: StatsStore().sincronizar(sorteios),
+        )
+
+
+# GERAÇÃO E PREÇO
+# ===================================================================
+def bench_geracao(b, pasta):
+    from draws import DrawCache
+    from stats import StatsStore
+
+    loteria = "Mega-Sena"
+    nomes = [
+        f"geracao.{nome}[{metodo}]"
+        for nome in ("gerar_numeros", "gerar_lote_10000")
+        for metodo in METODOS
+    ]
+    if not b.quer(*nomes):
+        return
+    stats = StatsStore().sincronizar(
+        DrawCache(os.path.join(pasta, "sorteios")).carregar(loteria)
+    )
+    gerador = GeradorJogos(
+        loteria, stats.frequencia, np.random.default_rng(0), stats=stats
+    )
+    for metodo in METODOS:
+        b.medir(
+            f"geracao.gerar_numeros[{metodo}]",
+            lambda: [gerador.gerar_numeros(metodo, 6) for _ in range(100)],
+        )
+        b.medir(
+            f"geracao.gerar_lote_10000[{metodo}]",
+            lambda: gerador.gerar_lote(metodo, 6, 10_000),
+        )
+
+
+def bench_preco(b, pasta):
+    from pricing import calcular_preco, calcular_precos
+
+    combinacoes = [
+        (loteria, n)
+        for loteria, config in LOTTERY_CONFIG.items()
+        for n in range(config["min_dezenas"], config["max_dezenas"] + 1)
+    ]
+    b.medir(
+        "preco.calcular_preco[todas_x100]",
+        lambda: [calcular_preco(l, n) for _ in range(100) for l, n in combinacoes],
+    )
+    tamanhos = np.random.default_rng(0).integers(6, 21, 100_000)
+    b.medir(
+        "preco.calcular_precos[100000]",
+        lambda: calcular_precos("Mega-Sena", tamanhos),
+    )
+
+
+# BANCO DE DADOS
+# ===================================================================
+def _popular(db, n, rng):
+    """Insere n registros de um jogo cada, espalhados nos últimos anos"""
+    from masks import mascaras
+
+    loterias = list(LOTTERY_CONFIG)
+    agora = datetime(2026, 1, 1)
+    proximo_id = db.cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM jogos").fetchone()[0]
+    with db.conn:
+        for inicio in range(0, n, 50_000):
+            fim = min(n, inicio + 50_000)
+            datas = [
+                (agora - timedelta(minutes=int(m))).strftime("%Y-%m-%d %H:%M:%S")
+                for m in rng.integers(0, 5 * 365 * 24 * 60, fim - inicio)
+            ]
+            escolhidas = rng.integers(0, len(loterias), fim - inicio)
+            db.cursor.executemany(
+                """
+                INSERT INTO jogos (loteria, metodo, numeros, num_dezenas, preco,
+                                   is_bolao, num_jogos, num_participantes,
+                                   data_criacao, observacoes)
+                VALUES (?, 'Probabilistico', '[]', 6, 5.0, 0, 1, 1, ?, '')
+            """,
+                [(loterias[l], d) for l, d in zip(escolhidas, datas)],
+            )
+            jogos = np.sort(
+                rng.random((fim - inicio, 60)).argsort(axis=1)[:, :6] + 1, axis=1
+            )
+            bits = mascaras(jogos).view(np.int64).tolist()
+            db.cursor.executemany(
+                """
+                INSERT INTO jogos_numeros (jogo_id, loteria, mascara_lo, mascara_hi)
+                VALUES (?, ?, ?, ?)
+            """,
+                [
+                    (proximo_id + i, loterias[l], lo, hi)
+                    for i, (l, (lo, hi)) in enumerate(zip(escolhidas, bits))
+                ],
+            )
+            proximo_id += fim - inicio
+
+
+def bench_banco(b, pasta, tamanhos):
+    from database import DatabaseManager
+
+    rng = np.random.default_rng(0)
+    # Os prints de DEBUG do banco não interessam aqui
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(pasta, "vazio.db"))
+        jogos = np.sort(rng.random((100, 60)).argsort(axis=1)[:, :6] + 1, axis=1)
+        b.medir(
+            "banco.salvar_lote[100_jogos]",
+            lambda: db.salvar_lote("Mega-Sena", "Probabilistico", jogos.tolist()),
+        )
+        db.close()
+
+        for n in tamanhos:
+            nomes = [
+                f"banco.{nome}[{n}]"
+                for nome in (
+                    "historico_pagina",
+                    "historico_pagina_meio",
+                    "buscar_jogos",
+                    "carregar_historico",
+                )
+            ]
+            # Popular 1M registros leva um tempo: só se algum for rodar
+            if not b.quer(*nomes):
+                continue
+            db = DatabaseManager(os.path.join(pasta, f"historico_{n}.db"))
+            _popular(db, n, rng)
+            db.conn.execute("ANALYZE")
+            rodadas = 1 if n >= 1_000_000 else None
+
+            b.medir(
+                f"banco.historico_pagina[{n}]",
+                lambda: db.carregar_historico_pagina(20),
+            )
+            _, cursor = db.carregar_historico_pagina(n // 2)
+            b.medir(
+                f"banco.historico_pagina_meio[{n}]",
+                lambda: db.carregar_historico_pagina(20, cursor),
+            )
+            b.medir(
+                f"banco.buscar_jogos[{n}]",
+                lambda: db.buscar_jogos(
+                    loteria="Quina", data_inicio="2025-12-01", data_fim="2025-12-31"
+                ),
+            )
+            b.medir(
+                f"banco.carregar_historico[{n}]",
+                db.carregar_historico,
+                rodadas=rodadas,
+            )
+            db.close()
+
+
+# CHECAGEM DE ATUALIZAÇÃO
+# ===================================================================
+class _ServidorReleases(BaseHTTPRequestHandler):
+    """Imita o /releases/latest do GitHub, com ETag"""
+
+    corpo = json.dumps({"tag_name": "v0.0.1", "assets": [], "body": ""}).encode()
+    etag = '"bench"'
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.corpo)))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+        self.wfile.write(self.corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def bench_updates(b, pasta):
+    from updates import UpdateManager
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _ServidorReleases)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/repos/bench"
+    try:
+        def novo_cache():
+            return tempfile.mkdtemp(dir=pasta)
+
+        b.medir(
+            "updates.check_for_updates[200]",
+            lambda cache_dir: UpdateManager(VERSION, url, cache_dir).check_for_updates(),
+            preparar=novo_cache,
+        )
+
+        cache_dir = novo_cache()
+        manager = UpdateManager(VERSION, url, cache_dir)
+        manager.check_for_updates()
+        b.medir("updates.check_for_updates[304]", manager.check_for_updates)
+
+        recente = UpdateManager(VERSION, url, cache_dir, min_check_interval=3600)
+        recente.check_for_updates()
+        b.medir("updates.check_for_updates[cache]", recente.check_for_updates)
+    finally:
+        servidor.shutdown()
+
+
+# RESULTADOS
+# ===================================================================
+def comparar(resultados, caminho_base, limite):
+    """Imprime a razão mediana atual / base; retorna True se algo regrediu além do limite"""
+    with open(caminho_base, "r", encoding="utf-8") as f:
+        base = {r["nome"]: r for r in json.load(f)["benchmarks"]}
+    regrediu = False
+    print(f"\nComparação com {caminho_base} (versão {VERSION}):", file=sys.stderr)
+    for r in resultados:
+        anterior = base.get(r["nome"])
+        if not anterior or not anterior["mediana"]:
+            continue
+        razao = r["mediana"] / anterior["mediana"]
+        marca = ""
+        if razao > limite:
+            marca = "  <-- REGRESSÃO"
+            regrediu = True
+        print(f"{r['nome']:<50} {razao:>7.2f}x{marca}", file=sys.stderr)
+    return regrediu
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Gerador de Loterias.")
+    parser.add_argument("-k", dest="filtro", help="Só os benchmarks cujo nome contém o texto")
+    parser.add_argument("--rodadas", type=int, default=5)
+    parser.add_argument(
+        "--tamanhos",
+        type=int,
+        nargs="+",
+        default=list(TAMANHOS_HISTORICO),
+        help="Registros no histórico para os benchmarks do banco",
+    )
+    parser.add_argument(
+        "--saida",
+        default=os.path.join(PASTA, f"benchmark-{VERSION}.json"),
+    )
+    parser.add_argument("--comparar", help="JSON de outra execução para comparar")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO)
+    args = parser.parse_args(argv)
+
+    b = Benchmark(args.filtro, args.rodadas)
+    with tempfile.TemporaryDirectory() as pasta:
+        bench_dados(b, pasta)
+        bench_geracao(b, pasta)
+        bench_preco(b, pasta)
+        bench_banco(b, pasta, args.tamanhos)
+        bench_updates(b, pasta)
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "versao": VERSION,
+                "data": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "processador": platform.processor() or platform.machine(),
+                "benchmarks": b.resultados,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    print(f"\nResultados em {args.saida}", file=sys.stderr)
+
+    if args.comparar and comparar(b.resultados, args.comparar, args.limite):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
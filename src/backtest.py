@@ -0,0 +1,197 @@
+"""
+Backtest dos métodos de geração sobre todo o histórico.
+
+Cada concurso é repetido em ordem: os jogos de cada método são gerados só
+com os concursos anteriores e conferidos contra aquele sorteio. As
+estatísticas avançam de forma incremental, um concurso por vez, e os
+métodos/trechos do histórico rodam em paralelo em processos separados.
+
+Exemplo (a partir da pasta src):
+    python -m backtest --loteria "Loto Mania" --jogos 10 --seed 42
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from config import LOTTERY_CONFIG
+from generator import GeradorJogos, METODOS, JANELA_PADRAO
+from masks import mascaras, acertos
+from pricing import tabela_premiacao
+
+logger = logging.getLogger(__name__)
+
+# Concursos iniciais usados só para formar as estatísticas
+AQUECIMENTO_PADRAO = 50
+
+
+def _avaliar(loteria, metodo, inicio, fim, jogos, num_dezenas, janela, semente, cache_dir):
+    """
+    Roda os concursos [inicio, fim) de um método. Executa em um processo
+    do pool, por isso recebe só valores simples e carrega o cache por conta própria.
+    """
+    from draws import DrawCache
+    from stats import EstatisticasLoteria
+
+    sorteios = DrawCache(cache_dir).carregar(loteria)
+    config = sorteios.config
+    bolas = np.asarray(sorteios.bolas)
+    rng = np.random.default_rng(semente)
+
+    stats = EstatisticasLoteria(loteria)
+    stats.acrescentar(bolas[:inicio])
+    sorteados = mascaras(bolas.reshape(-1, config["num_sorteados"]))
+    por_concurso = bolas.shape[1] // config["num_sorteados"]
+
+    distribuicao = np.zeros(config["num_sorteados"] + 1, dtype=np.int64)
+    for t in range(inicio, fim):
+        gerador = GeradorJogos(loteria, stats.frequencia, rng, stats=stats)
+        lote = gerador.gerar_lote(metodo, num_dezenas, jogos, janela)
+        # A Dupla Sena confere cada jogo contra os dois sorteios do concurso
+        alvo = sorteados[t * por_concurso : (t + 1) * por_concurso]
+        distribuicao += np.bincount(
+            acertos(mascaras(lote), alvo).ravel(), minlength=len(distribuicao)
+        )
+        stats.acrescentar(bolas[t : t + 1])
+    return metodo, distribuicao
+
+
+def backtest(
+    loteria,
+    metodos=METODOS,
+    jogos=10,
+    num_dezenas=None,
+    janela=JANELA_PADRAO,
+    aquecimento=AQUECIMENTO_PADRAO,
+    seed=None,
+    max_workers=None,
+    cache_dir=None,
+):
+    """
+    Retorna {metodo: {"distribuicao", "media", "premiados", "conferencias"}},
+    onde distribuicao[k] é quantas conferências tiveram k acertos.
+    """
+    from draws import DrawCache
+
+    config = LOTTERY_CONFIG[loteria]
+    num_dezenas = num_dezenas or config["min_dezenas"]
+    total = len(DrawCache(cache_dir).carregar(loteria))
+    aquecimento = min(aquecimento, total)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    # Trechos suficientes para ocupar todos os processos mesmo com poucos métodos
+    trechos = max(1, -(-max_workers // len(metodos)))
+    limites = np.linspace(aquecimento, total, trechos + 1).astype(int)
+    sementes = np.random.SeedSequence(seed).spawn(len(metodos) * trechos)
+
+    distribuicoes = {
+        m: np.zeros(config["num_sorteados"] + 1, dtype=np.int64) for m in metodos
+    }
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futuros = [
+            executor.submit(
+                _avaliar,
+                loteria,
+                metodo,
+                int(inicio),
+                int(fim),
+                jogos,
+                num_dezenas,
+                janela,
+                sementes[i * trechos + j],
+                cache_dir,
+            )
+            for i, metodo in enumerate(metodos)
+            for j, (inicio, fim) in enumerate(zip(limites[:-1], limites[1:]))
+            if fim > inicio
+        ]
+        for futuro in futuros:
+            metodo, distribuicao = futuro.result()
+            distribuicoes[metodo] += distribuicao
+
+    relatorio = {}
+    for metodo, distribuicao in distribuicoes.items():
+        conferencias = int(distribuicao.sum())
+        premiados = int(distribuicao[tabela_premiacao(loteria)].sum())
+        relatorio[metodo] = {
+            "distribuicao": distribuicao.tolist(),
+            "media": float(distribuicao @ np.arange(len(distribuicao)) / conferencias)
+            if conferencias
+            else 0.0,
+            "premiados": premiados,
+            "conferencias": conferencias,
+        }
+    return relatorio
+
+
+def formatar_relatorio(loteria, relatorio):
+    """Tabela em texto: conferências por número de acertos em cada método"""
+    faixas = LOTTERY_CONFIG[loteria]["faixas_premio"]
+    colunas = len(next(iter(relatorio.values()))["distribuicao"])
+    largura = max(len(m) for m in relatorio)
+    linhas = [
+        f"{'método':<{largura}}  {'média':>6}  {'prêmios':>8}  "
+        + " ".join(f"{k:>7}" for k in range(colunas))
+    ]
+    for metodo, r in relatorio.items():
+        linhas.append(
+            f"{metodo:<{largura}}  {r['media']:>6.3f}  {r['premiados']:>8}  "
+            + " ".join(f"{n:>7}" for n in r["distribuicao"])
+        )
+    linhas.append(
+        "Faixas de prêmio: "
+        + ", ".join(f"{k} = {nome}" for k, nome in sorted(faixas.items(), reverse=True))
+    )
+    return "\n".join(linhas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m backtest",
+        description="Compara os métodos de geração contra o histórico de sorteios.",
+    )
+    parser.add_argument("--loteria", choices=list(LOTTERY_CONFIG), default="Mega-Sena")
+    parser.add_argument("--metodos", nargs="+", choices=METODOS, default=list(METODOS))
+    parser.add_argument("--jogos", type=int, default=10, help="Jogos por concurso e método")
+    parser.add_argument("--dezenas", type=int, help="Dezenas por jogo (padrão: mínimo)")
+    parser.add_argument("--janela", type=int, default=JANELA_PADRAO)
+    parser.add_argument("--aquecimento", type=int, default=AQUECIMENTO_PADRAO)
+    parser.add_argument("--processos", type=int, help="Processos em paralelo")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+
+    config = LOTTERY_CONFIG[args.loteria]
+    num_dezenas = args.dezenas or config["min_dezenas"]
+    if not config["min_dezenas"] <= num_dezenas <= config["max_dezenas"]:
+        parser.error(
+            f"{args.loteria} aceita de {config['min_dezenas']} a {config['max_dezenas']} dezenas"
+        )
+    if args.jogos < 1 or args.janela < 1 or args.aquecimento < 0:
+        parser.error("--jogos e --janela devem ser positivos e --aquecimento não negativo")
+
+    relatorio = backtest(
+        args.loteria,
+        metodos=args.metodos,
+        jogos=args.jogos,
+        num_dezenas=num_dezenas,
+        janela=args.janela,
+        aquecimento=args.aquecimento,
+        seed=args.seed,
+        max_workers=args.processos,
+    )
+    if args.json:
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    else:
+        print(formatar_relatorio(args.loteria, relatorio))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import flet as ft
+
+from config import LOTTERY_CONFIG
+
+COR_BASE = "#e2e8f0"
+COR_TEXTO = "#475569"
+LARGURA_GRAFICO = 860
+
+
+class GraficoFrequencia:
+    """
+    Histograma de frequência de uma loteria como ft.BarChart nativo.
+    As barras são montadas uma vez por conjunto de dados; destacar outro
+    jogo só recolore as barras que mudaram.
+    """
+
+    def __init__(self, loteria, freq, chave):
+        self.loteria = loteria
+        self.chave = chave
+        self.config = LOTTERY_CONFIG[loteria]
+        self.destacadas = set()
+
+        total = self.config["num_total"]
+        largura = max(3, LARGURA_GRAFICO / total * 0.6)
+        maximo = max((int(f) for f in freq), default=0)
+        # Em loterias com muitas dezenas, rotula só de 5 em 5 para não encavalar
+        passo = 1 if total <= 30 else 5
+
+        self.barras = [
+            ft.BarChartRod(
+                from_y=0,
+                to_y=int(f),
+                width=largura,
+                color=COR_BASE,
+                border_radius=2,
+                tooltip=f"Dezena {n:02d}: {int(f)} vezes",
+            )
+            for n, f in enumerate(freq, start=1)
+        ]
+        self.controle = ft.BarChart(
+            bar_groups=[
+                ft.BarChartGroup(x=n, bar_rods=[barra])
+                for n, barra in enumerate(self.barras, start=1)
+            ],
+            left_axis=ft.ChartAxis(
+                labels_size=40,
+                title=ft.Text("Frequência (Vezes Sorteado)", color=COR_TEXTO, size=11),
+                title_size=20,
+            ),
+            bottom_axis=ft.ChartAxis(
+                labels=[
+                    ft.ChartAxisLabel(
+                        value=n, label=ft.Text(str(n), color=COR_TEXTO, size=10)
+                    )
+                    for n in range(1, total + 1)
+                    if n == 1 or n % passo == 0
+                ],
+                labels_size=20,
+            ),
+            horizontal_grid_lines=ft.ChartGridLines(color="#f1f5f9", width=1),
+            border=ft.border.only(
+                left=ft.BorderSide(1, "#cbd5e1"), bottom=ft.BorderSide(1, "#cbd5e1")
+            ),
+            tooltip_bgcolor="#1e293b",
+            max_y=maximo * 1.05 if maximo else 1,
+            interactive=True,
+            expand=True,
+        )
+
+    def destacar(self, jogo):
+        """Pinta as dezenas do jogo com a cor da loteria e devolve as demais ao cinza"""
+        total = self.config["num_total"]
+        novas = {int(n) for n in jogo if 1 <= n <= total}
+        for n in self.destacadas ^ novas:
+            self.barras[n - 1].color = (
+                self.config["cor_bola"] if n in novas else COR_BASE
+            )
+        self.destacadas = novas
+
+
+class CacheGraficos:
+    """Mantém um gráfico por loteria enquanto o conjunto de dados não muda"""
+
+    def __init__(self):
+        self._graficos = {}
+
+    def obter(self, loteria, freq, chave):
+        """Retorna (grafico, substituido); substituido é o gráfico antigo a liberar"""
+        atual = self._graficos.get(loteria)
+        if atual is not None and atual.chave == chave:
+            return atual, None
+        grafico = GraficoFrequencia(loteria, freq, chave)
+        self._graficos[loteria] = grafico
+        return grafico, atual
+
+    def limpar(self):
+        self._graficos.clear()
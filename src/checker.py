@@ -0,0 +1,82 @@
+import logging
+
+import numpy as np
+
+from config import LOTTERY_CONFIG
+from masks import mascaras, acertos
+from pricing import tabela_premiacao
+
+logger = logging.getLogger(__name__)
+
+# Jogos conferidos por bloco: blocos pequenos mantêm as matrizes temporárias no cache
+TAMANHO_BLOCO = 256
+
+
+class ResultChecker:
+    """
+    Confere os jogos salvos com os sorteios do histórico.
+    Cada jogo guarda até que concurso já foi conferido, então só os jogos
+    novos e os concursos novos entram em cada rodada.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def _sorteios_em_mascaras(self, sorteios):
+        """Máscaras por sorteio, com o concurso e o número do sorteio (1 ou 2)"""
+        por_concurso = sorteios.bolas.shape[1] // sorteios.config["num_sorteados"]
+        concursos = np.repeat(np.asarray(sorteios.concursos), por_concurso)
+        numero_sorteio = np.tile(
+            np.arange(1, por_concurso + 1, dtype=np.int32), len(sorteios)
+        )
+        return mascaras(sorteios.por_sorteio), concursos, numero_sorteio
+
+    def conferir(self, loteria, sorteios):
+        """Confere a loteria e retorna quantos prêmios novos foram encontrados"""
+        config = LOTTERY_CONFIG[loteria]
+        ultimo = sorteios.ultimo_concurso
+        linhas = self.db_manager.jogos_para_conferir(loteria, ultimo)
+        if not linhas:
+            return 0
+
+        dados = np.array(linhas, dtype=np.int64)
+        numero_ids, jogo_ids = dados[:, 0], dados[:, 1]
+        jogos = dados[:, 2:4].view(np.uint64)
+        conferido_ate = dados[:, 4]
+
+        mascaras_sorteio, concursos, numero_sorteio = self._sorteios_em_mascaras(
+            sorteios
+        )
+        premiado = tabela_premiacao(loteria)
+        menor_faixa = min(config["faixas_premio"])
+
+        resultados = []
+        # Normalmente há poucos grupos: jogos nunca conferidos e os da última rodada
+        for desde in np.unique(conferido_ate):
+            grupo = np.flatnonzero(conferido_ate == desde)
+            novos = np.flatnonzero(concursos > desde)
+            if len(novos) == 0:
+                continue
+            alvo = np.ascontiguousarray(mascaras_sorteio[novos])
+            for inicio in range(0, len(grupo), TAMANHO_BLOCO):
+                bloco = grupo[inicio : inicio + TAMANHO_BLOCO]
+                hits = acertos(jogos[bloco], alvo).ravel()
+                # flatnonzero no vetor é bem mais rápido que nonzero na matriz
+                pos = np.flatnonzero(hits >= menor_faixa)
+                pos = pos[premiado[hits[pos]]]
+                i, j = np.divmod(pos, len(novos))
+                resultados.extend(
+                    zip(
+                        numero_ids[bloco[i]].tolist(),
+                        jogo_ids[bloco[i]].tolist(),
+                        concursos[novos[j]].tolist(),
+                        numero_sorteio[novos[j]].tolist(),
+                        hits[pos].tolist(),
+                    )
+                )
+
+        self.db_manager.gravar_conferencias(
+            loteria, resultados, ultimo, int(numero_ids.max())
+        )
+        logger.info(f"{loteria}: {len(linhas)} jogos conferidos, {len(resultados)} prêmios")
+        return len(resultados)
@@ -0,0 +1,205 @@
+"""
+Geração de jogos em lote sem interface gráfica.
+
+Exemplos (a partir da pasta src):
+    python -m cli --loteria "Mega-Sena" --metodo probabilistico --jogos 20000 \\
+        --participantes 10 --formato csv --saida bolao.csv
+    python -m cli --loteria "Loto Fácil" --desdobrar 1 2 3 4 5 6 7 8 9 10 11 12 \\
+        13 14 15 16 17 18 --garantia 14
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+import numpy as np
+
+from config import LOTTERY_CONFIG
+from draws import DrawCache
+from generator import GeradorJogos, METODOS, JANELA_PADRAO
+from pricing import calcular_preco
+from stats import StatsStore
+from wheel import desdobrar, custo_desdobramento
+
+logger = logging.getLogger(__name__)
+
+# Jogos gerados e escritos por vez: mantém a memória constante em lotes grandes
+BLOCO_SAIDA = 10000
+
+
+def _escrever_txt(saida, bloco, inicio):
+    for i, jogo in enumerate(bloco, inicio):
+        saida.write(f"Jogo {i:02d}: {' - '.join(f'{n:02d}' for n in jogo)}\n")
+
+
+def _escrever_csv(saida, bloco, inicio):
+    for i, jogo in enumerate(bloco, inicio):
+        saida.write(f"{i},{','.join(map(str, jogo))}\n")
+
+
+def _escrever_jsonl(saida, bloco, inicio):
+    for i, jogo in enumerate(bloco, inicio):
+        saida.write(json.dumps({"jogo": i, "dezenas": jogo}) + "\n")
+
+
+ESCRITORES = {"txt": _escrever_txt, "csv": _escrever_csv, "jsonl": _escrever_jsonl}
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m cli", description="Gera jogos e calcula o custo do bolão."
+    )
+    parser.add_argument("--loteria", choices=list(LOTTERY_CONFIG), default="Mega-Sena")
+    parser.add_argument("--metodo", choices=METODOS, default="top_frequentes")
+    parser.add_argument(
+        "--dezenas", type=int, help="Dezenas por jogo (padrão: mínimo da loteria)"
+    )
+    parser.add_argument("--jogos", type=int, default=1, help="Quantidade de jogos")
+    parser.add_argument("--participantes", type=int, default=1)
+    parser.add_argument(
+        "--janela",
+        type=int,
+        default=JANELA_PADRAO,
+        help="Concursos da janela recente / meia-vida do decaimento",
+    )
+    parser.add_argument(
+        "--sem-repetidos",
+        action="store_true",
+        help="Bolão sem jogos repetidos, espalhando as dezenas entre os jogos",
+    )
+    parser.add_argument(
+        "--max-comum",
+        type=int,
+        help="Máximo de dezenas em comum entre dois jogos (implica --sem-repetidos)",
+    )
+    parser.add_argument(
+        "--desdobrar",
+        type=int,
+        nargs="+",
+        metavar="DEZENA",
+        help="Gera um desdobramento com estas dezenas em vez de jogos aleatórios",
+    )
+    parser.add_argument(
+        "--garantia", type=int, help="Acertos garantidos no desdobramento"
+    )
+    parser.add_argument(
+        "--condicao",
+        type=int,
+        help="...se esta quantidade de dezenas do pote sair (padrão: o máximo possível)",
+    )
+    parser.add_argument("--formato", choices=list(ESCRITORES), default="txt")
+    parser.add_argument("--saida", help="Arquivo de saída (padrão: stdout)")
+    parser.add_argument("--seed", type=int, help="Semente para resultados reproduzíveis")
+    return parser
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+
+    config = LOTTERY_CONFIG[args.loteria]
+    num_dezenas = args.dezenas or config["min_dezenas"]
+    if not config["min_dezenas"] <= num_dezenas <= config["max_dezenas"]:
+        parser.error(
+            f"{args.loteria} aceita de {config['min_dezenas']} a {config['max_dezenas']} dezenas"
+        )
+    if args.jogos < 1 or args.participantes < 1 or args.janela < 1:
+        parser.error("--jogos, --participantes e --janela devem ser maiores que zero")
+    if args.max_comum is not None and not 0 <= args.max_comum < num_dezenas:
+        parser.error(f"--max-comum deve estar entre 0 e {num_dezenas - 1}")
+
+    if args.desdobrar:
+        return _main_desdobramento(parser, args, config, num_dezenas)
+
+    freq = np.zeros(config["num_total"], dtype=int)
+    stats = None
+    if args.metodo != "surpresinha":
+        try:
+            sorteios = DrawCache().carregar(args.loteria)
+            stats = StatsStore().sincronizar(sorteios)
+            freq = stats.frequencia
+        except Exception as e:
+            logger.error(f"Erro ao carregar dados: {e}")
+
+    gerador = GeradorJogos(
+        args.loteria, freq, np.random.default_rng(args.seed), stats=stats
+    )
+    if args.sem_repetidos or args.max_comum is not None:
+        # As restrições valem entre todos os jogos, então o lote é gerado de uma vez
+        try:
+            lote = gerador.gerar_bolao(
+                args.metodo, num_dezenas, args.jogos, args.janela, args.max_comum
+            )
+        except ValueError as e:
+            logger.error(str(e))
+            return 1
+        blocos = (
+            lote[inicio : inicio + BLOCO_SAIDA].tolist()
+            for inicio in range(0, len(lote), BLOCO_SAIDA)
+        )
+    else:
+        blocos = (
+            gerador.gerar_lote(
+                args.metodo, num_dezenas, min(BLOCO_SAIDA, args.jogos - inicio), args.janela
+            ).tolist()
+            for inicio in range(0, args.jogos, BLOCO_SAIDA)
+        )
+    _gravar(args, num_dezenas, blocos)
+
+    custo = calcular_preco(args.loteria, num_dezenas) * args.jogos
+    print(
+        f"{args.jogos} jogo(s) de {args.loteria} com {num_dezenas} dezenas | "
+        f"Custo Total: R$ {custo:.2f} | "
+        f"Custo por Pessoa: R$ {custo / args.participantes:.2f}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _main_desdobramento(parser, args, config, num_dezenas):
+    pote = sorted(set(args.desdobrar))
+    if not all(1 <= n <= config["num_total"] for n in pote):
+        parser.error(f"As dezenas devem estar entre 1 e {config['num_total']}")
+    if args.garantia is None:
+        parser.error("--desdobrar precisa de --garantia")
+    condicao = args.condicao or min(config["num_sorteados"], len(pote))
+    try:
+        jogos = desdobrar(pote, num_dezenas, args.garantia, condicao)
+    except ValueError as e:
+        parser.error(str(e))
+
+    _gravar(args, num_dezenas, [jogos.tolist()])
+
+    custo, custo_pote = custo_desdobramento(args.loteria, jogos, len(pote))
+    print(
+        f"Desdobramento de {len(pote)} dezenas em {len(jogos)} jogo(s) de {num_dezenas} | "
+        f"Garantia: {args.garantia} acertos se {condicao} das dezenas saírem | "
+        f"Custo Total: R$ {custo:.2f} | "
+        f"Custo por Pessoa: R$ {custo / args.participantes:.2f} | "
+        f"Apostando todas num jogo só: R$ {custo_pote:.2f}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _gravar(args, num_dezenas, blocos):
+    """Escreve os blocos de jogos (listas de listas) no formato e destino escolhidos"""
+    escrever = ESCRITORES[args.formato]
+    saida = open(args.saida, "w", encoding="utf-8", newline="") if args.saida else sys.stdout
+    try:
+        if args.formato == "csv":
+            cabecalho = ",".join(f"dezena_{i}" for i in range(1, num_dezenas + 1))
+            saida.write(f"jogo,{cabecalho}\n")
+        inicio = 1
+        for bloco in blocos:
+            escrever(saida, bloco, inicio)
+            inicio += len(bloco)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
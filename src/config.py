@@ -1,9 +1,17 @@
 VERSION = "1.0.66"
 UPDATE_BASE_URL = "https://api.github.com/repos/marcelosanto/mega"
+# Intervalo mínimo entre consultas ao GitHub, em segundos (0 = sempre consulta)
+UPDATE_CHECK_INTERVAL = 6 * 60 * 60
+
+# Usados pelo platformdirs para montar os diretórios de dados e cache do usuário
+APP_NAME = "LoteriaGerador"
+APP_AUTHOR = "MarceloSanto"
 
 LOTTERY_CONFIG = {
     "Mega-Sena": {
         "caminho_xlsx": "assets/mega_sena.xlsx",
+        # Nome usado nos arquivos de importação e na API de resultados da Caixa
+        "codigo": "megasena",
         "colunas_numeros": ["bola 1", "bola 2", "bola 3", "bola 4", "bola 5", "bola 6"],
         "min_dezenas": 6,
         "max_dezenas": 20,
@@ -11,9 +19,12 @@ LOTTERY_CONFIG = {
         "preco_base": 5.00,
         "num_sorteados": 6,
         "cor_bola": "#209869",
+        # Acertos que dão prêmio -> nome da faixa
+        "faixas_premio": {6: "Sena", 5: "Quina", 4: "Quadra"},
     },
     "Loto Fácil": {
         "caminho_xlsx": "assets/loto_facil.xlsx",
+        "codigo": "lotofacil",
         "colunas_numeros": [f"bola {i}" for i in range(1, 16)],
         "min_dezenas": 15,
         "max_dezenas": 20,
@@ -21,9 +32,11 @@ LOTTERY_CONFIG = {
         "preco_base": 3.00,
         "num_sorteados": 15,
         "cor_bola": "#930089",
+        "faixas_premio": {n: f"{n} pontos" for n in range(15, 10, -1)},
     },
     "Quina": {
         "caminho_xlsx": "assets/quina.xlsx",
+        "codigo": "quina",
         "colunas_numeros": ["bola 1", "bola 2", "bola 3", "bola 4", "bola 5"],
         "min_dezenas": 5,
         "max_dezenas": 15,
@@ -31,19 +44,27 @@ LOTTERY_CONFIG = {
         "preco_base": 2.50,
         "num_sorteados": 5,
         "cor_bola": "#260085",
+        "faixas_premio": {5: "Quina", 4: "Quadra", 3: "Terno", 2: "Duque"},
     },
     "Loto Mania": {
         "caminho_xlsx": "assets/lotomania.xlsx",
+        "codigo": "lotomania",
         "colunas_numeros": [f"bola {i}" for i in range(1, 21)],
         "min_dezenas": 50,
         "max_dezenas": 50,
         "num_total": 99,  # 00 a 99
+        "menor_dezena": 0,
         "preco_base": 3.00,
         "num_sorteados": 20,
         "cor_bola": "#f7941d",
+        "faixas_premio": {
+            **{n: f"{n} pontos" for n in range(20, 14, -1)},
+            0: "0 pontos",
+        },
     },
     "Dupla Sena": {
         "caminho_xlsx": "assets/dupla_sena.xlsx",
+        "codigo": "duplasena",
         "colunas_numeros": [f"Sorteio1 - bola {i}" for i in range(1, 7)],
         "colunas_numeros_2": [
             f"Sorteio2 - bola {i}" for i in range(1, 7)
@@ -54,5 +75,6 @@ LOTTERY_CONFIG = {
         "preco_base": 2.50,
         "num_sorteados": 6,
         "cor_bola": "#bf190e",
+        "faixas_premio": {6: "Sena", 5: "Quina", 4: "Quadra", 3: "Terno"},
     },
 }
@@ -1,154 +1,454 @@
 import sqlite3
 import json
 import os
-from math import comb
+import threading
+import weakref
+
+import numpy as np
 
 # from utils import get_resource_path
-from config import LOTTERY_CONFIG
+from config import APP_NAME, APP_AUTHOR
+from pricing import custo_jogos
+from masks import mascara, mascaras, numeros_da_mascara, para_sqlite
 import platformdirs
 
+# Versão do esquema gravada em PRAGMA user_version
+VERSAO_ESQUEMA = 2
 
-class DatabaseManager:
-    def __init__(self):
-        # Define o nome do seu app e do autor para criar um caminho padronizado
-        app_name = "LoteriaGerador"
-        app_author = "MarceloSanto"  # Pode ser seu nome de usuário do GitHub
 
-        # Pega o diretório de dados padrão para o sistema operacional atual
-        data_dir = platformdirs.user_data_dir(app_name, app_author)
+class _MarcadorThread:
+    """Objeto guardado no threading.local só para saber quando a thread acabou"""
+
 
-        # Cria o diretório se ele não existir
-        os.makedirs(data_dir, exist_ok=True)
+class DatabaseManager:
+    def __init__(self, db_path=None):
+        if db_path is None:
+            # Pega o diretório de dados padrão para o sistema operacional atual
+            data_dir = platformdirs.user_data_dir(APP_NAME, APP_AUTHOR)
+
+            # Cria o diretório se ele não existir
+            os.makedirs(data_dir, exist_ok=True)
 
-        # Cria o caminho final para o banco de dados
-        db_path = os.path.join(data_dir, "loteria_historico.db")
+            # Cria o caminho final para o banco de dados
+            db_path = os.path.join(data_dir, "loteria_historico.db")
 
         print(f"DEBUG: Caminho do Banco de Dados: {db_path}")
 
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.cursor = self.conn.cursor()
+        self.db_path = db_path
+        # Uma conexão por thread (eventos do Flet, carregador, updates) e um
+        # único escritor por vez: o SQLite não aceita escritas concorrentes.
+        self._local = threading.local()
+        self._conexoes = []
+        self._conexoes_lock = threading.Lock()
+        self._escrita = threading.RLock()
+
+        self.conn.execute("PRAGMA journal_mode = WAL")
         self.init_database()
 
+    def _conectar(self):
+        # check_same_thread=False só para o close() poder fechar todas no fim
+        conn = sqlite3.connect(
+            self.db_path, timeout=30, cached_statements=256, check_same_thread=False
+        )
+        conn.execute("PRAGMA foreign_keys = ON")
+        # Com WAL, NORMAL só sincroniza no checkpoint e continua seguro contra corrupção
+        conn.execute("PRAGMA synchronous = NORMAL")
+        with self._conexoes_lock:
+            self._conexoes.append(conn)
+        return conn
+
+    def _descartar(self, conn):
+        with self._conexoes_lock:
+            if conn in self._conexoes:
+                self._conexoes.remove(conn)
+        conn.close()
+
+    @property
+    def conn(self):
+        """Conexão da thread atual"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._conectar()
+            # O threading.local é descartado quando a thread termina; o
+            # finalizador do marcador fecha então a conexão da thread
+            self._local.marcador = _MarcadorThread()
+            weakref.finalize(self._local.marcador, self._descartar, conn)
+        return conn
+
+    def fechar_conexao_thread(self):
+        """Fecha a conexão da thread atual (para workers de vida curta)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.cursor = None
+        self._local.conn = None
+        self._local.marcador = None  # dispara o finalizador, que fecha a conexão
+
+    @property
+    def cursor(self):
+        """Cursor da thread atual"""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = self.conn.cursor()
+        return cursor
+
     def init_database(self):
         try:
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS jogos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    loteria TEXT NOT NULL,
-                    metodo TEXT NOT NULL,
-                    numeros TEXT NOT NULL,
-                    num_dezenas INTEGER NOT NULL,
-                    preco REAL NOT NULL,
-                    is_bolao BOOLEAN NOT NULL,
-                    num_jogos INTEGER DEFAULT 1,
-                    num_participantes INTEGER DEFAULT 1,
-                    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    observacoes TEXT
-                )
-            """)
-            self.conn.commit()
+            with self._escrita:
+                self._criar_tabelas()
             print("DEBUG: Banco de dados inicializado com sucesso!")
         except sqlite3.Error as e:
             print(f"Erro ao inicializar banco de dados: {e}")
 
-    def calcular_preco(self, loteria, num_dezenas):
-        """Calcula o preço baseado na loteria e número de dezenas"""
+    def _criar_tabelas(self):
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jogos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                loteria TEXT NOT NULL,
+                metodo TEXT NOT NULL,
+                numeros TEXT NOT NULL,
+                num_dezenas INTEGER NOT NULL,
+                preco REAL NOT NULL,
+                is_bolao BOOLEAN NOT NULL,
+                num_jogos INTEGER DEFAULT 1,
+                num_participantes INTEGER DEFAULT 1,
+                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                observacoes TEXT
+            )
+        """)
+        self.conn.commit()
+        self.migrar()
+
+    def migrar(self):
+        """Aplica as migrações de esquema pendentes"""
+        versao = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+        for numero in range(versao + 1, VERSAO_ESQUEMA + 1):
+            self._aplicar_migracao(numero, getattr(self, f"_migrar_v{numero}"))
+
+    def _aplicar_migracao(self, numero, migracao):
+        """
+        Roda a migração e grava a versão numa única transação explícita: sem o
+        BEGIN, o sqlite3 do Python faria o autocommit de cada ALTER/CREATE/DROP
+        e uma migração interrompida ficaria pela metade.
+        """
+        print(f"DEBUG: Migrando banco para a versão {numero}")
+        self.cursor.execute("BEGIN")
         try:
-            config = LOTTERY_CONFIG[loteria]
-            if loteria == "Mega-Sena":
-                if num_dezenas < 6 or num_dezenas > 20:
-                    return 0
-                num_combs = comb(num_dezenas, 6)
-            elif loteria == "Loto Fácil":
-                if num_dezenas < 15 or num_dezenas > 20:
-                    return 0
-                num_combs = comb(num_dezenas, 15)
-            else:
-                return 0
-            return num_combs * config["preco_base"]
-        except Exception as e:
-            print(f"Erro ao calcular preço: {e}")
-            return 0
+            migracao()
+            self.cursor.execute(f"PRAGMA user_version = {numero}")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+    def _migrar_v1(self):
+        """Tabela com um jogo por linha (máscara de bits) e índices de busca"""
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jogos_numeros (
+                id INTEGER PRIMARY KEY,
+                jogo_id INTEGER NOT NULL REFERENCES jogos(id) ON DELETE CASCADE,
+                loteria TEXT NOT NULL,
+                mascara_lo INTEGER NOT NULL,
+                mascara_hi INTEGER NOT NULL
+            )
+        """)
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jogos_numeros_jogo ON jogos_numeros(jogo_id)"
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jogos_numeros_loteria ON jogos_numeros(loteria)"
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jogos_loteria_data ON jogos(loteria, data_criacao)"
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jogos_data ON jogos(data_criacao)"
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jogos_metodo ON jogos(metodo)"
+        )
+
+        # Converte o JSON das linhas antigas para a tabela nova, pulando as
+        # que já foram convertidas
+        self.cursor.execute("""
+            SELECT id, loteria, numeros FROM jogos
+            WHERE id NOT IN (SELECT jogo_id FROM jogos_numeros)
+        """)
+        for jogo_id, loteria, numeros_json in self.cursor.fetchall():
+            try:
+                jogos = json.loads(numeros_json)
+            except ValueError:
+                continue
+            if jogos and not isinstance(jogos[0], list):
+                jogos = [jogos]
+            self._inserir_numeros(jogo_id, loteria, jogos)
+
+    def _migrar_v2(self):
+        """Resultado da conferência dos jogos salvos com os sorteios"""
+        # Último concurso já conferido para cada jogo
+        self.cursor.execute("""
+            ALTER TABLE jogos_numeros
+            ADD COLUMN conferido_ate INTEGER NOT NULL DEFAULT 0
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conferencias (
+                numero_id INTEGER NOT NULL
+                    REFERENCES jogos_numeros(id) ON DELETE CASCADE,
+                jogo_id INTEGER NOT NULL,
+                concurso INTEGER NOT NULL,
+                sorteio INTEGER NOT NULL DEFAULT 1,
+                acertos INTEGER NOT NULL,
+                PRIMARY KEY (numero_id, concurso, sorteio)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conferencias_jogo ON conferencias(jogo_id, acertos)"
+        )
+        self.cursor.execute("DROP INDEX IF EXISTS idx_jogos_numeros_loteria")
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jogos_numeros_loteria ON jogos_numeros(loteria, conferido_ate)"
+        )
+
+    def _inserir_numeros(self, jogo_id, loteria, jogos):
+        try:
+            # Bolões têm jogos do mesmo tamanho: converte tudo de uma vez
+            bits = mascaras(np.asarray(jogos)).view(np.int64).tolist()
+        except (ValueError, TypeError):
+            bits = [[para_sqlite(p) for p in mascara(jogo)] for jogo in jogos]
+        self.cursor.executemany(
+            """
+            INSERT INTO jogos_numeros (jogo_id, loteria, mascara_lo, mascara_hi)
+            VALUES (?, ?, ?, ?)
+        """,
+            [(jogo_id, loteria, lo, hi) for lo, hi in bits],
+        )
 
     def salvar_no_banco(self, app, observacoes=""):
-        """Salva o jogo no banco - PARÂMETROS CORRIGIDOS"""
+        """Salva os jogos atuais do app no banco"""
         try:
             if not app.jogos_atuais:
                 print("DEBUG: Nenhum jogo para salvar!")
                 return False
 
-            # Obter valores corretos
-            loteria = app.loteria.current.value
-            metodo = app.metodo.current.value
-            num_dezenas = int(app.num_dezenas.current.value)
-            num_jogos = len(app.jogos_atuais)
+            is_bolao = app.is_bolao.current.value
             num_participantes = (
-                int(app.num_participantes.current.value)
-                if app.is_bolao.current.value
-                else 1
+                int(app.num_participantes.current.value) if is_bolao else 1
             )
-            is_bolao = app.is_bolao.current.value
+            return self.salvar_lote(
+                app.loteria.current.value,
+                app.metodo.current.value,
+                app.jogos_atuais,
+                is_bolao=is_bolao,
+                num_participantes=num_participantes,
+                observacoes=observacoes,
+            )
+        except Exception as e:
+            print(f"Erro geral ao salvar jogo: {e}")
+            return False
+
+    def salvar_lote(
+        self,
+        loteria,
+        metodo,
+        jogos,
+        is_bolao=True,
+        num_participantes=1,
+        observacoes="",
+    ):
+        """Salva um registro com todos os jogos em uma única transação"""
+        try:
+            # len(): os jogos podem vir como matriz NumPy
+            if len(jogos) == 0:
+                print("DEBUG: Nenhum jogo para salvar!")
+                return False
 
-            # Calcular preço total
-            preco_por_jogo = self.calcular_preco(loteria, num_dezenas)
-            preco_total = preco_por_jogo * num_jogos
+            num_dezenas = len(jogos[0])
+            num_jogos = len(jogos)
 
-            # Converter jogos para JSON
-            numeros_json = json.dumps(app.jogos_atuais)
+            preco_total = custo_jogos(loteria, jogos)
 
             print(
                 f"DEBUG: Salvando jogo - Loteria: {loteria}, Jogos: {num_jogos}, Preço: R$ {preco_total:.2f}"
             )
 
-            # Inserir no banco
-            self.cursor.execute(
-                """
-                INSERT INTO jogos
-                (loteria, metodo, numeros, num_dezenas, preco, is_bolao,
-                 num_jogos, num_participantes, observacoes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    loteria,
-                    metodo,
-                    numeros_json,
-                    num_dezenas,
-                    preco_total,
-                    is_bolao,
-                    num_jogos,
-                    num_participantes,
-                    observacoes,
-                ),
-            )
+            # Os números ficam em jogos_numeros, um jogo por linha
+            with self._escrita, self.conn:
+                self.cursor.execute(
+                    """
+                    INSERT INTO jogos
+                    (loteria, metodo, numeros, num_dezenas, preco, is_bolao,
+                     num_jogos, num_participantes, observacoes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                    (
+                        loteria,
+                        metodo,
+                        "[]",
+                        num_dezenas,
+                        preco_total,
+                        is_bolao,
+                        num_jogos,
+                        num_participantes,
+                        observacoes,
+                    ),
+                )
+                self._inserir_numeros(self.cursor.lastrowid, loteria, jogos)
 
-            self.conn.commit()
             print("DEBUG: Jogo salvo com sucesso no banco!")
             return True
 
         except sqlite3.Error as e:
             print(f"Erro SQL ao salvar jogo: {e}")
             return False
-        except Exception as e:
-            print(f"Erro geral ao salvar jogo: {e}")
-            return False
+
+    # Colunas do histórico; o primeiro jogo de cada registro vem de jogos_numeros
+    SELECT_HISTORICO = """
+        SELECT j.id, j.loteria, j.metodo, n.mascara_lo, n.mascara_hi,
+               j.num_dezenas, j.preco, j.is_bolao, j.num_jogos,
+               j.num_participantes, datetime(j.data_criacao, 'localtime'),
+               j.observacoes, j.data_criacao
+        FROM jogos j
+        LEFT JOIN jogos_numeros n ON n.id = (
+            SELECT MIN(id) FROM jogos_numeros WHERE jogo_id = j.id
+        )
+    """
+
+    def _linha_historico(self, linha):
+        """Troca as máscaras pela lista de números do primeiro jogo"""
+        numeros = numeros_da_mascara(linha[3], linha[4]) if linha[3] is not None else []
+        return (linha[0], linha[1], linha[2], numeros) + tuple(linha[5:])
 
     def carregar_historico(self):
         """Carrega o histórico de jogos"""
         try:
-            query = """
-                SELECT id, loteria, metodo, numeros, num_dezenas, preco,
-                       is_bolao, num_jogos, num_participantes,
-                       datetime(data_criacao, 'localtime'), observacoes
-                FROM jogos ORDER BY data_criacao DESC
-            """
+            query = self.SELECT_HISTORICO + " ORDER BY j.data_criacao DESC"
             self.cursor.execute(query)
-            jogos = self.cursor.fetchall()
+            jogos = [self._linha_historico(l) for l in self.cursor.fetchall()]
             print(f"DEBUG: Carregados {len(jogos)} jogos do histórico")
             return jogos
         except sqlite3.Error as e:
             print(f"Erro ao carregar histórico: {e}")
             return []
 
+    def carregar_historico_pagina(self, tamanho=20, cursor=None):
+        """
+        Página do histórico por keyset: cursor é o (data_criacao, id) do último
+        registro da página anterior. Retorna (jogos, proximo_cursor), com
+        proximo_cursor None quando não há mais páginas.
+        """
+        try:
+            query = self.SELECT_HISTORICO
+            params = []
+            if cursor is not None:
+                query += " WHERE (j.data_criacao, j.id) < (?, ?)"
+                params.extend(cursor)
+            query += " ORDER BY j.data_criacao DESC, j.id DESC LIMIT ?"
+            params.append(tamanho)
+
+            self.cursor.execute(query, params)
+            jogos = [self._linha_historico(l) for l in self.cursor.fetchall()]
+            proximo = (jogos[-1][11], jogos[-1][0]) if len(jogos) == tamanho else None
+            return jogos, proximo
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar página do histórico: {e}")
+            return [], None
+
+    def carregar_numeros(self, jogo_id):
+        """Retorna todos os jogos (listas de dezenas) de um registro"""
+        try:
+            self.cursor.execute(
+                """
+                SELECT mascara_lo, mascara_hi FROM jogos_numeros
+                WHERE jogo_id = ? ORDER BY id
+            """,
+                (jogo_id,),
+            )
+            return [numeros_da_mascara(lo, hi) for lo, hi in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar números: {e}")
+            return []
+
+    def jogos_para_conferir(self, loteria, ultimo_concurso):
+        """Jogos da loteria ainda não conferidos até o último concurso"""
+        try:
+            self.cursor.execute(
+                """
+                SELECT id, jogo_id, mascara_lo, mascara_hi, conferido_ate
+                FROM jogos_numeros WHERE loteria = ? AND conferido_ate < ?
+            """,
+                (loteria, ultimo_concurso),
+            )
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao listar jogos para conferir: {e}")
+            return []
+
+    def gravar_conferencias(self, loteria, resultados, ultimo_concurso, ate_id):
+        """
+        Grava os prêmios encontrados, como linhas
+        (numero_id, jogo_id, concurso, sorteio, acertos), e marca os jogos
+        com id <= ate_id como conferidos até ultimo_concurso.
+        """
+        try:
+            with self._escrita, self.conn:
+                self.cursor.executemany(
+                    """
+                    INSERT OR REPLACE INTO conferencias
+                    (numero_id, jogo_id, concurso, sorteio, acertos)
+                    VALUES (?, ?, ?, ?, ?)
+                """,
+                    resultados,
+                )
+                self.cursor.execute(
+                    """
+                    UPDATE jogos_numeros SET conferido_ate = ?
+                    WHERE loteria = ? AND conferido_ate < ? AND id <= ?
+                """,
+                    (ultimo_concurso, loteria, ultimo_concurso, ate_id),
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar conferências: {e}")
+            return False
+
+    def premios_por_jogo(self, jogo_ids):
+        """{jogo_id: {acertos: quantidade}} dos registros informados"""
+        if not jogo_ids:
+            return {}
+        try:
+            marcadores = ",".join("?" * len(jogo_ids))
+            self.cursor.execute(
+                f"""
+                SELECT jogo_id, acertos, COUNT(*) FROM conferencias
+                WHERE jogo_id IN ({marcadores})
+                GROUP BY jogo_id, acertos
+            """,
+                list(jogo_ids),
+            )
+            premios = {}
+            for jogo_id, acertos, quantidade in self.cursor.fetchall():
+                premios.setdefault(jogo_id, {})[acertos] = quantidade
+            return premios
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar prêmios: {e}")
+            return {}
+
+    def buscar_por_numero(self, loteria, numero):
+        """Ids dos registros da loteria com algum jogo contendo a dezena"""
+        coluna, bit = ("mascara_lo", numero) if numero < 64 else ("mascara_hi", numero - 64)
+        try:
+            self.cursor.execute(
+                f"""
+                SELECT DISTINCT jogo_id FROM jogos_numeros
+                WHERE loteria = ? AND ({coluna} >> ?) & 1
+            """,
+                (loteria, bit),
+            )
+            return [linha[0] for linha in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Erro na busca por número: {e}")
+            return []
+
     def mostrar_detalhes_jogo(self, jogo_id):
         """Mostra detalhes de um jogo específico"""
         try:
@@ -173,8 +473,8 @@ class DatabaseManager:
                 return False
 
             # Excluir o jogo
-            self.cursor.execute("DELETE FROM jogos WHERE id = ?", (jogo_id,))
-            self.conn.commit()
+            with self._escrita, self.conn:
+                self.cursor.execute("DELETE FROM jogos WHERE id = ?", (jogo_id,))
             print(f"DEBUG: Jogo {jogo_id} excluído com sucesso")
             return True
         except sqlite3.Error as e:
@@ -195,34 +495,30 @@ class DatabaseManager:
     def buscar_jogos(self, loteria=None, metodo=None, data_inicio=None, data_fim=None):
         """Busca jogos com filtros"""
         try:
-            query = """
-                SELECT id, loteria, metodo, numeros, num_dezenas, preco,
-                       is_bolao, num_jogos, num_participantes,
-                       datetime(data_criacao, 'localtime'), observacoes
-                FROM jogos WHERE 1=1
-            """
+            query = self.SELECT_HISTORICO + " WHERE 1=1"
             params = []
 
             if loteria:
-                query += " AND loteria = ?"
+                query += " AND j.loteria = ?"
                 params.append(loteria)
 
             if metodo:
-                query += " AND metodo = ?"
+                query += " AND j.metodo = ?"
                 params.append(metodo)
 
+            # Comparações direto na coluna (sem date()) para usar os índices
             if data_inicio:
-                query += " AND date(data_criacao) >= ?"
+                query += " AND j.data_criacao >= ?"
                 params.append(data_inicio)
 
             if data_fim:
-                query += " AND date(data_criacao) <= ?"
+                query += " AND j.data_criacao < date(?, '+1 day')"
                 params.append(data_fim)
 
-            query += " ORDER BY data_criacao DESC"
+            query += " ORDER BY j.data_criacao DESC"
 
             self.cursor.execute(query, params)
-            jogos = self.cursor.fetchall()
+            jogos = [self._linha_historico(l) for l in self.cursor.fetchall()]
             print(f"DEBUG: Busca retornou {len(jogos)} jogos")
             return jogos
         except sqlite3.Error as e:
@@ -258,10 +554,13 @@ class DatabaseManager:
             return {}
 
     def close(self):
-        """Fecha a conexão com o banco"""
+        """Fecha as conexões com o banco"""
         try:
-            if hasattr(self, "conn") and self.conn:
-                self.conn.close()
-                print("DEBUG: Conexão com banco fechada")
+            with self._conexoes_lock:
+                for conn in self._conexoes:
+                    conn.close()
+                self._conexoes.clear()
+            self._local = threading.local()
+            print("DEBUG: Conexão com banco fechada")
         except Exception as e:
             print(f"Erro ao fechar banco: {e}")
@@ -0,0 +1,73 @@
+"""
+Applies binary patches in the classic bsdiff 4 format ("BSDIFF40"), as
+produced by the `bsdiff` command line tool. Used by the updater to move
+between consecutive releases without downloading the whole executable.
+"""
+
+import bz2
+import numpy as np
+
+MAGIC = b"BSDIFF40"
+HEADER_SIZE = 32
+
+
+class PatchError(ValueError):
+    """The patch is corrupt or does not match the file being patched."""
+
+
+def _offtin(values):
+    """Decodes bsdiff's sign-magnitude little-endian 64-bit integers."""
+    raw = np.frombuffer(values, dtype="<u8")
+    magnitude = (raw & np.uint64(0x7FFFFFFFFFFFFFFF)).astype(np.int64)
+    return np.where(raw >> np.uint64(63), -magnitude, magnitude)
+
+
+def apply_patch(old: bytes, patch: bytes) -> bytes:
+    """Returns the new file rebuilt from the old one and a BSDIFF40 patch."""
+    if len(patch) < HEADER_SIZE or patch[:8] != MAGIC:
+        raise PatchError("Not a BSDIFF40 patch")
+    ctrl_len, diff_len, new_size = (int(v) for v in _offtin(patch[8:HEADER_SIZE]))
+    if ctrl_len < 0 or diff_len < 0 or new_size < 0:
+        raise PatchError("Corrupt patch header")
+
+    ctrl_end = HEADER_SIZE + ctrl_len
+    diff_end = ctrl_end + diff_len
+    try:
+        ctrl = bz2.decompress(patch[HEADER_SIZE:ctrl_end])
+        diff = np.frombuffer(bz2.decompress(patch[ctrl_end:diff_end]), dtype=np.uint8)
+        extra = np.frombuffer(bz2.decompress(patch[diff_end:]), dtype=np.uint8)
+    except (OSError, ValueError) as e:
+        raise PatchError(f"Corrupt patch data: {e}") from e
+    if len(ctrl) % 24:
+        raise PatchError("Corrupt control block")
+
+    old = np.frombuffer(old, dtype=np.uint8)
+    new = np.empty(new_size, dtype=np.uint8)
+    new_pos = old_pos = diff_pos = extra_pos = 0
+
+    # Each triple: add x diff bytes onto old, copy y extra bytes, seek old by z
+    for x, y, z in _offtin(ctrl).reshape(-1, 3).tolist():
+        if x < 0 or y < 0 or new_pos + x + y > new_size:
+            raise PatchError("Control block points outside the new file")
+        if diff_pos + x > len(diff) or extra_pos + y > len(extra):
+            raise PatchError("Control block points outside the patch data")
+
+        segment = diff[diff_pos:diff_pos + x].copy()
+        # Bytes outside the old file are added to zero, as in bspatch
+        lo = max(0, -old_pos)
+        hi = min(x, len(old) - old_pos)
+        if hi > lo:
+            segment[lo:hi] += old[old_pos + lo:old_pos + hi]
+        new[new_pos:new_pos + x] = segment
+        new_pos += x
+        old_pos += x
+        diff_pos += x
+
+        new[new_pos:new_pos + y] = extra[extra_pos:extra_pos + y]
+        new_pos += y
+        extra_pos += y
+        old_pos += z
+
+    if new_pos != new_size:
+        raise PatchError("Patch ended before the new file was complete")
+    return new.tobytes()
@@ -0,0 +1,240 @@
+import os
+import json
+import hashlib
+import logging
+
+import numpy as np
+import platformdirs
+
+from config import LOTTERY_CONFIG, APP_NAME, APP_AUTHOR
+from utils import get_resource_path
+
+logger = logging.getLogger(__name__)
+
+# Incrementar sempre que o layout dos arquivos de cache mudar
+FORMATO_CACHE = 1
+# Concursos importados muito além do último conhecido são quase certamente
+# erro de digitação (e, uma vez gravados, esconderiam os concursos reais)
+SALTO_MAXIMO_CONCURSOS = 1000
+
+
+class Sorteios:
+    """Histórico de uma loteria em formato colunar, em ordem cronológica"""
+
+    def __init__(self, loteria, concursos, datas, bolas):
+        self.loteria = loteria
+        self.config = LOTTERY_CONFIG[loteria]
+        self.concursos = concursos  # (n,) int32
+        self.datas = datas  # (n,) datetime64[D]
+        self.bolas = bolas  # (n, colunas) uint8 - Dupla Sena tem os dois sorteios na mesma linha
+
+    def __len__(self):
+        return len(self.concursos)
+
+    @property
+    def por_sorteio(self):
+        """Matriz (sorteios, num_sorteados): na Dupla Sena cada concurso vira duas linhas"""
+        return self.bolas.reshape(-1, self.config["num_sorteados"])
+
+    @property
+    def ultimo_concurso(self):
+        return int(self.concursos[-1]) if len(self.concursos) else 0
+
+
+class DrawCache:
+    """
+    Compila as planilhas de resultados em arquivos .npy mapeados em memória.
+    A planilha só é lida de novo quando muda de tamanho/data ou de conteúdo.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(
+            platformdirs.user_cache_dir(APP_NAME, APP_AUTHOR), "sorteios"
+        )
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._abertos = {}
+
+    def _colunas(self, config):
+        return config["colunas_numeros"] + config.get("colunas_numeros_2", [])
+
+    def _prefixo(self, config):
+        nome = os.path.splitext(os.path.basename(config["caminho_xlsx"]))[0]
+        return os.path.join(self.cache_dir, nome)
+
+    def _hash_arquivo(self, caminho):
+        h = hashlib.sha256()
+        with open(caminho, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+        return h.hexdigest()
+
+    def carregar(self, loteria):
+        """Retorna os sorteios da loteria, compilando o cache se necessário"""
+        if loteria in self._abertos:
+            return self._abertos[loteria]
+
+        config = LOTTERY_CONFIG[loteria]
+        xlsx_path = get_resource_path(config["caminho_xlsx"])
+        if not os.path.exists(xlsx_path):
+            raise FileNotFoundError(f"Arquivo {xlsx_path} não encontrado.")
+
+        st = os.stat(xlsx_path)
+        prefixo = self._prefixo(config)
+        meta = self._ler_meta(prefixo)
+
+        if meta is not None and meta.get("colunas") == self._colunas(config):
+            if meta["mtime_ns"] == st.st_mtime_ns and meta["tamanho"] == st.st_size:
+                return self._abrir(loteria, prefixo)
+
+            # O executável one-file extrai os assets a cada execução, mudando o
+            # mtime. Se o conteúdo for o mesmo, só atualizamos a chave.
+            if meta["tamanho"] == st.st_size and meta["sha256"] == self._hash_arquivo(
+                xlsx_path
+            ):
+                meta["mtime_ns"] = st.st_mtime_ns
+                self._gravar_meta(prefixo, meta)
+                return self._abrir(loteria, prefixo)
+
+        logger.info(f"Compilando cache de sorteios para {loteria}")
+        concursos, datas, bolas = self._compilar(xlsx_path, config)
+        self._gravar(prefixo, concursos, datas, bolas)
+        self._gravar_meta(
+            prefixo,
+            {
+                "formato": FORMATO_CACHE,
+                "mtime_ns": st.st_mtime_ns,
+                "tamanho": st.st_size,
+                "sha256": self._hash_arquivo(xlsx_path),
+                "colunas": self._colunas(config),
+                "num_concursos": int(len(concursos)),
+            },
+        )
+        return self._abrir(loteria, prefixo)
+
+    def _compilar(self, xlsx_path, config):
+        import pandas as pd
+
+        df = pd.read_excel(xlsx_path, sheet_name=0, skiprows=6)
+        colunas = self._colunas(config)
+        df = df.dropna(subset=["Concurso"] + colunas).sort_values("Concurso")
+
+        concursos = df["Concurso"].to_numpy(dtype=np.int32)
+        datas = (
+            pd.to_datetime(df["Data"], format="%d/%m/%Y", errors="coerce")
+            .to_numpy()
+            .astype("datetime64[D]")
+        )
+        bolas = np.ascontiguousarray(df[colunas].to_numpy(dtype=np.uint8))
+        return concursos, datas, bolas
+
+    def _gravar(self, prefixo, concursos, datas, bolas):
+        for sufixo, arr in (
+            ("concursos", concursos),
+            ("datas", datas),
+            ("bolas", bolas),
+        ):
+            destino = f"{prefixo}.{sufixo}.npy"
+            tmp = destino + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, arr, allow_pickle=False)
+            os.replace(tmp, destino)
+
+    def _abrir(self, loteria, prefixo):
+        concursos = np.load(f"{prefixo}.concursos.npy", mmap_mode="r")
+        datas = np.load(f"{prefixo}.datas.npy", mmap_mode="r")
+        bolas = np.load(f"{prefixo}.bolas.npy", mmap_mode="r")
+
+        novos = self._ler_novos(prefixo)
+        if novos is not None:
+            # Concursos importados que a planilha já cobre são descartados
+            ultimo = int(concursos[-1]) if len(concursos) else 0
+            manter = novos[0] > ultimo
+            if manter.any():
+                concursos = np.concatenate([concursos, novos[0][manter]])
+                datas = np.concatenate([datas, novos[1][manter]])
+                bolas = np.concatenate([bolas, novos[2][manter]])
+
+        self._abertos[loteria] = Sorteios(loteria, concursos, datas, bolas)
+        return self._abertos[loteria]
+
+    def _ler_novos(self, prefixo):
+        try:
+            return tuple(
+                np.load(f"{prefixo}.novos.{sufixo}.npy")
+                for sufixo in ("concursos", "datas", "bolas")
+            )
+        except (OSError, ValueError):
+            return None
+
+    def acrescentar(self, loteria, concursos, datas, bolas):
+        """
+        Acrescenta concursos novos sem reler a planilha. Eles ficam em arquivos
+        .novos.*.npy à parte, reescritos inteiros (são poucos). Retorna quantos
+        concursos foram de fato acrescentados.
+        """
+        config = LOTTERY_CONFIG[loteria]
+        atuais = self.carregar(loteria)
+
+        concursos = np.asarray(concursos, dtype=np.int32)
+        datas = np.asarray(datas, dtype="datetime64[D]")
+        bolas = np.asarray(bolas, dtype=np.int64)
+        colunas = len(self._colunas(config))
+        if bolas.ndim != 2 or bolas.shape[1] != colunas or len(bolas) != len(concursos):
+            raise ValueError(f"Esperadas {colunas} dezenas por concurso em {loteria}")
+        menor = config.get("menor_dezena", 1)
+        if bolas.size and (bolas.min() < menor or bolas.max() > config["num_total"]):
+            raise ValueError(f"Dezena fora do intervalo em {loteria}")
+        # Na Dupla Sena, cada sorteio é conferido separadamente
+        por_sorteio = len(config["colunas_numeros"])
+        for inicio in range(0, colunas, por_sorteio):
+            ordenadas = np.sort(bolas[:, inicio : inicio + por_sorteio], axis=1)
+            if (np.diff(ordenadas, axis=1) == 0).any():
+                raise ValueError(f"Dezena repetida em um sorteio de {loteria}")
+        limite = atuais.ultimo_concurso + SALTO_MAXIMO_CONCURSOS
+        if atuais.ultimo_concurso and len(concursos) and concursos.max() > limite:
+            raise ValueError(
+                f"Concurso {int(concursos.max())} muito além do último conhecido "
+                f"({atuais.ultimo_concurso}) em {loteria}"
+            )
+
+        # Só o que vem depois do último concurso conhecido, sem repetições
+        concursos, idx = np.unique(concursos, return_index=True)
+        manter = concursos > atuais.ultimo_concurso
+        concursos, idx = concursos[manter], idx[manter]
+        if not len(concursos):
+            return 0
+        datas = datas[idx]
+        bolas = bolas[idx].astype(np.uint8)
+
+        prefixo = self._prefixo(config)
+        novos = self._ler_novos(prefixo)
+        if novos is not None:
+            ja = novos[0] < concursos[0]
+            concursos = np.concatenate([novos[0][ja], concursos])
+            datas = np.concatenate([novos[1][ja], datas])
+            bolas = np.concatenate([novos[2][ja], bolas])
+        self._gravar(f"{prefixo}.novos", concursos, datas, bolas)
+
+        self._abrir(loteria, prefixo)
+        return len(idx)
+
+    def _ler_meta(self, prefixo):
+        try:
+            with open(f"{prefixo}.meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("formato") != FORMATO_CACHE:
+                return None
+            for sufixo in ("concursos", "datas", "bolas"):
+                if not os.path.exists(f"{prefixo}.{sufixo}.npy"):
+                    return None
+            return meta
+        except (OSError, ValueError):
+            return None
+
+    def _gravar_meta(self, prefixo, meta):
+        # O meta é gravado por último e serve de marcador de cache completo
+        destino = f"{prefixo}.meta.json"
+        tmp = destino + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, destino)
@@ -0,0 +1,297 @@
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from config import LOTTERY_CONFIG
+from masks import mascaras
+
+METODOS = (
+    "top_frequentes",
+    "menos_frequentes",
+    "probabilistico",
+    "surpresinha",
+    "janela_recente",
+    "decaimento_exponencial",
+    "pares_fortes",
+    "mais_atrasadas",
+)
+
+# Concursos considerados pela janela recente (ou meia-vida do decaimento)
+JANELA_PADRAO = 50
+
+# Tamanho do "pote" de números considerado pelos métodos de ranking
+LIMITE_POTE = {"Loto Mania": 75, "Mega-Sena": 40, "Quina": 40, "Dupla Sena": 40}
+LIMITE_POTE_PADRAO = 20
+
+# Linhas por bloco: limita a matriz de chaves aleatórias a alguns MB
+TAMANHO_BLOCO = 16384
+
+# Bolão sem repetição: candidatos sorteados por rodada, peso das dezenas já
+# usadas enquanto houver dezenas sem uso e limite de subconjuntos por jogo para
+# a checagem de sobreposição por hash (acima disso, compara com todos os jogos)
+BLOCO_BOLAO = 64
+FATOR_COBERTURA = 0.1
+LIMITE_SUBCONJUNTOS = 256
+
+
+class GeradorJogos:
+    """
+    Gera jogos de uma loteria a partir da frequência histórica das dezenas.
+    O ranking é ordenado uma única vez e todos os jogos de um lote são
+    sorteados de uma vez só sobre uma matriz de chaves aleatórias.
+    """
+
+    def __init__(self, loteria, freq, rng=None, stats=None):
+        self.loteria = loteria
+        self.config = LOTTERY_CONFIG[loteria]
+        self.freq = np.asarray(freq, dtype=np.float64)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        # Estatísticas com contagem acumulada, usadas pelos métodos por janela
+        self.stats = stats
+        # (concursos, log do lift dos pares) para os pares fortes
+        self._lift = None
+
+        self.sem_dados = len(self.freq) == 0 or not np.any(self.freq > 0)
+        if not self.sem_dados:
+            # Mais frequentes no início
+            self.numeros_ordenados = (
+                np.argsort(self.freq, kind="stable")[::-1] + 1
+            ).astype(np.uint8)
+            self.probs = self.freq / self.freq.sum()
+
+    def _limite(self, num_dezenas):
+        limite = LIMITE_POTE.get(self.loteria, LIMITE_POTE_PADRAO)
+        # Garante que haja números suficientes
+        return max(limite, num_dezenas + 5)
+
+    def _pote_e_pesos(self, metodo, num_dezenas, janela=JANELA_PADRAO):
+        todos = np.arange(1, self.config["num_total"] + 1, dtype=np.uint8)
+        if metodo == "surpresinha" or self.sem_dados:
+            return todos, None
+        if metodo in ("janela_recente", "decaimento_exponencial"):
+            if janela < 1:
+                raise ValueError("A janela deve ter pelo menos 1 concurso")
+            if self.stats is None:
+                return todos, self.probs
+            if metodo == "janela_recente":
+                pesos = self.stats.frequencia_janela(janela)
+            else:
+                pesos = self.stats.frequencia_decaida(janela)
+            pesos = np.asarray(pesos, dtype=np.float64)
+            # Uma janela curta pode não ter nenhuma dezena: cai no sorteio uniforme
+            return todos, pesos / pesos.sum() if pesos.sum() > 0 else None
+
+        if metodo == "pares_fortes":
+            # Pesos da primeira dezena de cada jogo; as seguintes ainda levam
+            # o lift dos pares (ver _gerar_pares_fortes)
+            return todos, self.probs
+
+        limite = self._limite(num_dezenas)
+        if metodo == "mais_atrasadas":
+            if self.stats is None:
+                return todos, self.probs
+            return self.stats.ranking_atrasadas[:limite].astype(np.uint8), None
+        if metodo == "top_frequentes":
+            return self.numeros_ordenados[:limite], None
+        if metodo == "menos_frequentes":
+            return self.numeros_ordenados[-limite:], None
+        if metodo == "probabilistico":
+            return todos, self.probs
+        raise ValueError(f"Método desconhecido: {metodo}")
+
+    def _chaves(self, n, pesos, tamanho):
+        """
+        Chaves aleatórias cujo menor k de cada linha é uma amostra sem reposição.
+        Com pesos, E/p (E ~ Exp(1)) reproduz o sorteio sucessivo ponderado
+        do np.random.choice(p=..., replace=False).
+        """
+        chaves = self.rng.standard_exponential((n, tamanho), dtype=np.float32)
+        if pesos is None:
+            return chaves
+
+        zerados = pesos <= 0
+        with np.errstate(divide="ignore"):
+            chaves = chaves / pesos.astype(np.float32)
+        if zerados.any():
+            # Dezenas que nunca saíram só entram depois de todas as outras
+            teto = chaves[:, ~zerados].max(axis=1, keepdims=True)
+            chaves[:, zerados] = teto + self.rng.standard_exponential(
+                (n, int(zerados.sum())), dtype=np.float32
+            )
+        return chaves
+
+    def gerar_lote(self, metodo, num_dezenas, n, janela=JANELA_PADRAO):
+        """
+        Retorna uma matriz (n, num_dezenas) uint8 de jogos, cada linha ordenada.
+        janela: concursos da janela recente ou meia-vida do decaimento.
+        """
+        pote, pesos = self._pote_e_pesos(metodo, num_dezenas, janela)
+        if num_dezenas > len(pote):
+            raise ValueError(
+                f"{num_dezenas} dezenas não cabem em um pote de {len(pote)} números"
+            )
+        if metodo == "pares_fortes" and self.stats is not None and not self.sem_dados:
+            return self._gerar_pares_fortes(num_dezenas, n)
+
+        jogos = np.empty((n, num_dezenas), dtype=np.uint8)
+        for inicio in range(0, n, TAMANHO_BLOCO):
+            fim = min(n, inicio + TAMANHO_BLOCO)
+            chaves = self._chaves(fim - inicio, pesos, len(pote))
+            idx = np.argpartition(chaves, num_dezenas - 1, axis=1)[:, :num_dezenas]
+            jogos[inicio:fim] = pote[idx]
+        jogos.sort(axis=1)
+        return jogos
+
+    def _log_lift(self):
+        """
+        Log do lift de cada par: vezes em que saíram juntas sobre o esperado
+        pela frequência de cada uma. Guardado até as estatísticas mudarem.
+        """
+        if self._lift is not None and self._lift[0] == self.stats.num_concursos:
+            return self._lift[1]
+        pares = self.stats.pares.astype(np.float64)
+        freq = np.diag(pares).copy()
+        np.fill_diagonal(pares, 0)
+        esperado = np.outer(freq, freq)
+        np.fill_diagonal(esperado, 0)
+        if esperado.sum() > 0:
+            esperado *= pares.sum() / esperado.sum()
+        # +1 suaviza os pares raros; o log deixa o produto dos lifts como soma
+        log_lift = np.log((pares + 1) / (esperado + 1)).astype(np.float32)
+        np.fill_diagonal(log_lift, 0)
+        self._lift = (self.stats.num_concursos, log_lift)
+        return log_lift
+
+    def _gerar_pares_fortes(self, num_dezenas, n, probs=None):
+        """
+        Cresce cada jogo a partir de uma dezena sorteada pela frequência (ou
+        por probs, se dado). Cada dezena seguinte tem esse peso multiplicado
+        pelo lift dos pares que forma com as já escolhidas.
+        """
+        total = self.config["num_total"]
+        log_lift = self._log_lift()
+        probs = np.asarray(self.probs if probs is None else probs, dtype=np.float32)
+
+        jogos = np.empty((n, num_dezenas), dtype=np.uint8)
+        for inicio in range(0, n, TAMANHO_BLOCO):
+            fim = min(n, inicio + TAMANHO_BLOCO)
+            linhas = np.arange(fim - inicio)
+            afinidade = np.zeros((fim - inicio, total), dtype=np.float32)
+            for passo in range(num_dezenas):
+                # Chaves em log: E/p vira log E - log p, sem estourar o float32
+                with np.errstate(divide="ignore"):
+                    chaves = (
+                        np.log(self.rng.standard_exponential(afinidade.shape, dtype=np.float32))
+                        - np.log(probs)
+                        - afinidade
+                    )
+                chaves[linhas[:, None], jogos[inicio:fim, :passo] - 1] = np.inf
+                nova = np.argmin(chaves, axis=1)
+                jogos[inicio:fim, passo] = nova + 1
+                afinidade += log_lift[nova]
+        jogos.sort(axis=1)
+        return jogos
+
+    def gerar_bolao(
+        self, metodo, num_dezenas, n, janela=JANELA_PADRAO, max_comum=None
+    ):
+        """
+        Como gerar_lote, mas sem jogos repetidos e, se max_comum for dado, sem
+        dois jogos com mais de max_comum dezenas em comum. Dezenas já usadas
+        perdem peso, espalhando a cobertura do bolão pelo pote.
+        """
+        pote, pesos = self._pote_e_pesos(metodo, num_dezenas, janela)
+        if num_dezenas > len(pote):
+            raise ValueError(
+                f"{num_dezenas} dezenas não cabem em um pote de {len(pote)} números"
+            )
+        distintos = comb(len(pote), num_dezenas)
+        if distintos < n:
+            raise ValueError(
+                f"Só existem {distintos} jogos diferentes de {num_dezenas} dezenas "
+                f"entre os {len(pote)} números deste método"
+            )
+        base = np.full(len(pote), 1.0) if pesos is None else np.asarray(pesos)
+        uso = np.zeros(len(pote))
+        # Nos pares fortes o pote é 1..num_total, então o índice é a dezena - 1
+        pares_fortes = (
+            metodo == "pares_fortes" and self.stats is not None and not self.sem_dados
+        )
+
+        vistos = set()
+        # Dois jogos dividem mais de max_comum dezenas se, e só se, dividem
+        # algum subconjunto de max_comum + 1: com poucos subconjuntos por
+        # jogo, a checagem é uma consulta de hash, sem depender de n
+        por_hash = (
+            max_comum is not None
+            and comb(num_dezenas, max_comum + 1) <= LIMITE_SUBCONJUNTOS
+        )
+        subconjuntos = set()
+        aceitos = np.empty((n, 2), dtype=np.uint64)
+
+        jogos = np.empty((n, num_dezenas), dtype=np.uint8)
+        total = 0
+        rejeitados = 0
+        limite_rejeicoes = max(1000, 20 * n)
+        while total < n:
+            # Cobertura: enquanto houver dezenas sem uso, as já usadas têm o
+            # peso reduzido; depois que todas saíram, valem os pesos do método
+            atuais = base * np.where(uso > 0, FATOR_COBERTURA, 1.0)
+            # Enquanto houver dezena do pote sem uso, os pesos mudam a cada jogo
+            bloco = 1 if uso.min() == 0 else min(BLOCO_BOLAO, n - total)
+            if pares_fortes:
+                indices = (
+                    self._gerar_pares_fortes(num_dezenas, bloco, atuais / atuais.sum())
+                    .astype(np.intp)
+                    - 1
+                )
+            else:
+                chaves = self._chaves(bloco, atuais / atuais.sum(), len(pote))
+                indices = np.sort(
+                    np.argpartition(chaves, num_dezenas - 1, axis=1)[:, :num_dezenas],
+                    axis=1,
+                )
+            for idx, bits in zip(indices, mascaras(pote[indices])):
+                chave = (int(bits[0]), int(bits[1]))
+                candidato = tuple(idx.tolist())
+                if chave in vistos:
+                    rejeitados += 1
+                elif por_hash and any(
+                    s in subconjuntos for s in combinations(candidato, max_comum + 1)
+                ):
+                    rejeitados += 1
+                elif (
+                    max_comum is not None
+                    and not por_hash
+                    and total
+                    and np.bitwise_count(aceitos[:total] & bits).sum(axis=1).max()
+                    > max_comum
+                ):
+                    rejeitados += 1
+                else:
+                    vistos.add(chave)
+                    if por_hash:
+                        subconjuntos.update(combinations(candidato, max_comum + 1))
+                    aceitos[total] = bits
+                    jogos[total] = pote[idx]
+                    uso[idx] += 1
+                    total += 1
+                    if total == n:
+                        break
+                if rejeitados > limite_rejeicoes:
+                    if max_comum is None:
+                        raise ValueError(
+                            f"Só foi possível gerar {total} de {n} jogos diferentes; "
+                            "diminua a quantidade de jogos ou aumente as dezenas"
+                        )
+                    raise ValueError(
+                        f"Só foi possível gerar {total} de {n} jogos com no máximo "
+                        f"{max_comum} dezenas em comum"
+                    )
+        jogos.sort(axis=1)
+        return jogos
+
+    def gerar_numeros(self, metodo, num_dezenas, janela=JANELA_PADRAO):
+        """Gera um único jogo como lista ordenada de inteiros"""
+        return self.gerar_lote(metodo, num_dezenas, 1, janela)[0].tolist()
@@ -0,0 +1,236 @@
+"""
+Importação incremental de sorteios, sem reler as planilhas.
+
+Os concursos novos vêm de arquivos CSV/JSON deixados na pasta de importação
+(nomeados pelo código da loteria, ex.: megasena.csv) ou de um buscador
+plugável; o padrão consulta a API de resultados da Caixa.
+
+Exemplo (a partir da pasta src):
+    python -m ingest --loteria "Mega-Sena" --arquivo novos.csv
+    python -m ingest --loteria "Mega-Sena" --buscar
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import platformdirs
+
+from config import LOTTERY_CONFIG, APP_NAME, APP_AUTHOR
+
+logger = logging.getLogger(__name__)
+
+URL_API_CAIXA = "https://servicebus2.caixa.gov.br/portaldeloterias/api"
+FORMATOS_DATA = ("%d/%m/%Y", "%Y-%m-%d")
+EXTENSOES = (".csv", ".json")
+
+
+def _data(texto):
+    for formato in FORMATOS_DATA:
+        try:
+            return np.datetime64(datetime.strptime(str(texto).strip(), formato), "D")
+        except ValueError:
+            continue
+    return np.datetime64("NaT", "D")
+
+
+def normalizar(item):
+    """
+    Converte um concurso para {"concurso", "data", "dezenas"}. Aceita tanto o
+    formato próprio quanto a resposta da API da Caixa (numero, dataApuracao,
+    listaDezenas e, na Dupla Sena, listaDezenasSegundoSorteio).
+    """
+    if "numero" in item:
+        dezenas = list(item.get("listaDezenas") or [])
+        dezenas += item.get("listaDezenasSegundoSorteio") or []
+        return {
+            "concurso": int(item["numero"]),
+            "data": item.get("dataApuracao"),
+            "dezenas": [int(d) for d in dezenas],
+        }
+    return {
+        "concurso": int(item["concurso"]),
+        "data": item.get("data"),
+        "dezenas": [int(d) for d in item["dezenas"]],
+    }
+
+
+def ler_csv(caminho):
+    """Linhas Concurso, Data, dezenas...; cabeçalho opcional, separador , ou ;"""
+    with open(caminho, newline="", encoding="utf-8-sig") as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        try:
+            separador = csv.Sniffer().sniff(amostra, delimiters=",;\t").delimiter
+        except csv.Error:
+            # Amostras curtas confundem o Sniffer; o ; é o separador das exportações
+            separador = ";" if amostra.count(";") >= amostra.count(",") else ","
+        registros = []
+        for linha in csv.reader(f, delimiter=separador):
+            if not linha or not linha[0].strip().isdigit():
+                continue
+            registros.append(
+                {
+                    "concurso": int(linha[0]),
+                    "data": linha[1],
+                    "dezenas": [int(d) for d in linha[2:] if d.strip()],
+                }
+            )
+    return registros
+
+
+def ler_json(caminho):
+    """Uma lista de concursos, um objeto {"sorteios": [...]} ou um único concurso"""
+    with open(caminho, "r", encoding="utf-8") as f:
+        dados = json.load(f)
+    if isinstance(dados, dict):
+        dados = dados.get("sorteios", [dados])
+    return [normalizar(item) for item in dados]
+
+
+def ler_arquivo(caminho):
+    if caminho.lower().endswith(".json"):
+        return ler_json(caminho)
+    return ler_csv(caminho)
+
+
+class BuscadorCaixa:
+    """
+    Buscador padrão: um concurso por requisição na API pública da Caixa.
+    Qualquer callable f(loteria, a_partir_de) -> lista de concursos serve
+    como buscador, o que permite trocá-lo por um stub quando offline.
+    """
+
+    def __init__(self, url_base=URL_API_CAIXA, timeout=10, session=None):
+        self.url_base = url_base
+        self.timeout = timeout
+        self.session = session
+
+    def _obter(self, url):
+        resposta = self.session.get(url, timeout=self.timeout)
+        resposta.raise_for_status()
+        return normalizar(resposta.json())
+
+    def __call__(self, loteria, a_partir_de):
+        if self.session is None:
+            import requests
+
+            self.session = requests.Session()
+
+        url = f"{self.url_base}/{LOTTERY_CONFIG[loteria]['codigo']}"
+        ultimo = self._obter(url)
+        registros = [
+            self._obter(f"{url}/{n}") for n in range(a_partir_de, ultimo["concurso"])
+        ]
+        if ultimo["concurso"] >= a_partir_de:
+            registros.append(ultimo)
+        return registros
+
+
+class IngestorSorteios:
+    """
+    Acrescenta concursos ao DrawCache e atualiza as estatísticas só com os
+    concursos novos.
+    """
+
+    def __init__(self, draw_cache, stats_store, pasta=None):
+        self.draw_cache = draw_cache
+        self.stats_store = stats_store
+        self.pasta = pasta or os.path.join(
+            platformdirs.user_data_dir(APP_NAME, APP_AUTHOR), "importar"
+        )
+
+    def acrescentar(self, loteria, registros):
+        """Retorna quantos concursos novos entraram no histórico"""
+        if not registros:
+            return 0
+        config = LOTTERY_CONFIG[loteria]
+        colunas = len(config["colunas_numeros"]) + len(config.get("colunas_numeros_2", []))
+        for r in registros:
+            if len(r["dezenas"]) != colunas:
+                raise ValueError(
+                    f"Concurso {r['concurso']} de {loteria} tem {len(r['dezenas'])} "
+                    f"dezenas; esperadas {colunas}"
+                )
+
+        novos = self.draw_cache.acrescentar(
+            loteria,
+            [r["concurso"] for r in registros],
+            [_data(r["data"]) for r in registros],
+            [r["dezenas"] for r in registros],
+        )
+        if novos and self.stats_store.obter(loteria) is not None:
+            # sincronizar só processa os concursos que as estatísticas ainda não viram
+            self.stats_store.sincronizar(self.draw_cache.carregar(loteria))
+        if novos:
+            logger.info(f"{novos} concurso(s) novo(s) de {loteria} importado(s)")
+        return novos
+
+    def importar_arquivo(self, loteria, caminho):
+        return self.acrescentar(loteria, ler_arquivo(caminho))
+
+    def importar_pendentes(self, loteria):
+        """Importa os arquivos da loteria na pasta de importação e os marca como importados"""
+        if not os.path.isdir(self.pasta):
+            return 0
+        codigo = LOTTERY_CONFIG[loteria]["codigo"]
+        total = 0
+        for nome in sorted(os.listdir(self.pasta)):
+            if not nome.startswith(codigo) or not nome.lower().endswith(EXTENSOES):
+                continue
+            caminho = os.path.join(self.pasta, nome)
+            try:
+                registros = ler_arquivo(caminho)
+                if not registros:
+                    # Fica na pasta para o usuário corrigir, em vez de sumir
+                    logger.error(f"Nenhum concurso lido de {caminho}")
+                    continue
+                total += self.acrescentar(loteria, registros)
+                os.replace(caminho, caminho + ".importado")
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Erro ao importar {caminho}: {e}")
+        return total
+
+    def buscar(self, loteria, buscador=None):
+        """Pede ao buscador os concursos posteriores ao último conhecido"""
+        buscador = buscador or BuscadorCaixa()
+        ultimo = self.draw_cache.carregar(loteria).ultimo_concurso
+        return self.acrescentar(loteria, buscador(loteria, ultimo + 1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m ingest", description="Acrescenta concursos novos ao histórico."
+    )
+    parser.add_argument("--loteria", choices=list(LOTTERY_CONFIG), required=True)
+    origem = parser.add_mutually_exclusive_group(required=True)
+    origem.add_argument("--arquivo", help="Arquivo CSV ou JSON com os concursos")
+    origem.add_argument(
+        "--buscar", action="store_true", help="Busca na API de resultados da Caixa"
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    from draws import DrawCache
+    from stats import StatsStore
+
+    ingestor = IngestorSorteios(DrawCache(), StatsStore())
+    try:
+        if args.arquivo:
+            novos = ingestor.importar_arquivo(args.loteria, args.arquivo)
+        else:
+            novos = ingestor.buscar(args.loteria)
+    except Exception as e:
+        logger.error(f"Erro na importação: {e}")
+        return 1
+    print(f"{novos} concurso(s) novo(s) de {args.loteria}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
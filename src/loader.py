@@ -0,0 +1,74 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import LOTTERY_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class DataLoader:
+    """
+    Carrega o histórico de sorteios e as estatísticas em threads de fundo.
+    Cada loteria é carregada uma única vez; quem precisar dos dados recebe
+    um Future e pode esperar por ele em vez de falhar.
+    """
+
+    def __init__(self, draw_cache, stats_store, max_workers=2, ingestor=None):
+        self.draw_cache = draw_cache
+        self.stats_store = stats_store
+        # Se informado, importa os arquivos da pasta de importação antes das estatísticas
+        self.ingestor = ingestor
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="carregador"
+        )
+        self._futuros = {}
+        self._lock = threading.Lock()
+        # Callbacks chamados como f(loteria, concluidas, total, erro)
+        self.ouvintes = []
+
+    def _tarefa(self, loteria):
+        if self.ingestor is not None:
+            self.ingestor.importar_pendentes(loteria)
+        sorteios = self.draw_cache.carregar(loteria)
+        stats = self.stats_store.sincronizar(sorteios)
+        return sorteios, stats
+
+    def _notificar(self, loteria, futuro):
+        erro = futuro.exception()
+        if erro:
+            logger.error(f"Erro ao carregar {loteria}: {erro}")
+        with self._lock:
+            total = len(self._futuros)
+            concluidas = sum(1 for f in self._futuros.values() if f.done())
+        for ouvinte in list(self.ouvintes):
+            try:
+                ouvinte(loteria, concluidas, total, erro)
+            except Exception as e:
+                logger.error(f"Erro no callback de progresso: {e}")
+
+    def carregar(self, loteria):
+        """Retorna o Future com (sorteios, stats) da loteria, agendando se preciso"""
+        with self._lock:
+            futuro = self._futuros.get(loteria)
+            if futuro is None or (futuro.done() and futuro.exception()):
+                futuro = self._executor.submit(self._tarefa, loteria)
+                self._futuros[loteria] = futuro
+                novo = True
+            else:
+                novo = False
+        if novo:
+            futuro.add_done_callback(lambda f: self._notificar(loteria, f))
+        return futuro
+
+    def prefetch_todas(self, primeira=None):
+        """Agenda todas as loterias, começando pela informada"""
+        ordem = sorted(LOTTERY_CONFIG, key=lambda loteria: loteria != primeira)
+        return [self.carregar(loteria) for loteria in ordem]
+
+    def pendentes(self):
+        with self._lock:
+            return [l for l, f in self._futuros.items() if not f.done()]
+
+    def encerrar(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,8 +1,44 @@
+import os
+import sys
+import logging
+import multiprocessing
+import platformdirs
+from utils import PerfilImportacao
+
+# Modo de perfil de inicialização: `loteria-gerador --perfil-importacao` ou
+# LOTERIA_PERFIL_IMPORTACAO=1. Precisa ser ativado antes dos imports pesados.
+perfil = None
+if "--perfil-importacao" in sys.argv or os.environ.get("LOTERIA_PERFIL_IMPORTACAO"):
+    perfil = PerfilImportacao().iniciar()
+
 import flet as ft
 from ui import LoteriaUI
 from database import DatabaseManager
+from draws import DrawCache
+from stats import StatsStore
+from loader import DataLoader
+from ingest import IngestorSorteios
+from checker import ResultChecker
 from updates import UpdateManager
-from config import VERSION, UPDATE_BASE_URL
+from config import (
+    VERSION,
+    UPDATE_BASE_URL,
+    UPDATE_CHECK_INTERVAL,
+    APP_NAME,
+    APP_AUTHOR,
+)
+
+
+def configurar_log_perfil():
+    log_dir = platformdirs.user_log_dir(APP_NAME, APP_AUTHOR)
+    os.makedirs(log_dir, exist_ok=True)
+    log_path = os.path.join(log_dir, "inicializacao.log")
+    logging.basicConfig(
+        filename=log_path,
+        level=logging.INFO,
+        format="%(asctime)s %(name)s %(levelname)s: %(message)s",
+    )
+    print(f"DEBUG: Perfil de importação em: {log_path}")
 
 
 class LoteriaApp:
@@ -16,8 +52,21 @@ class LoteriaApp:
         self.jogos_atuais = []
         self.numeros_flat = []
         self.freq = []
+        self.perfil = perfil
         self.db_manager = DatabaseManager()
-        self.update_manager = UpdateManager(VERSION, UPDATE_BASE_URL)
+        self.draw_cache = DrawCache()
+        self.stats_store = StatsStore()
+        self.ingestor = IngestorSorteios(self.draw_cache, self.stats_store)
+        self.loader = DataLoader(
+            self.draw_cache, self.stats_store, ingestor=self.ingestor
+        )
+        self.checker = ResultChecker(self.db_manager)
+        self.update_manager = UpdateManager(
+            VERSION,
+            UPDATE_BASE_URL,
+            cache_dir=platformdirs.user_data_dir(APP_NAME, APP_AUTHOR),
+            min_check_interval=UPDATE_CHECK_INTERVAL,
+        )
         self.ui = LoteriaUI(self)
 
     def run(self):
@@ -25,5 +74,9 @@ class LoteriaApp:
 
 
 if __name__ == "__main__":
+    # No executável do PyInstaller, os processos do pool (simulação) reentram por aqui
+    multiprocessing.freeze_support()
+    if perfil:
+        configurar_log_perfil()
     app = LoteriaApp()
     app.run()
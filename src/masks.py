@@ -0,0 +1,65 @@
+"""
+Jogos e sorteios como máscaras de bits: a dezena n liga o bit n.
+Como a Lotomania vai até 99, cada máscara ocupa duas palavras de 64 bits.
+"""
+
+import numpy as np
+
+PALAVRAS = 2
+
+
+def mascara(numeros):
+    """Retorna (lo, hi) como inteiros sem sinal"""
+    valor = 0
+    for n in numeros:
+        valor |= 1 << int(n)
+    return valor & 0xFFFFFFFFFFFFFFFF, valor >> 64
+
+
+def numeros_da_mascara(lo, hi):
+    valor = (lo & 0xFFFFFFFFFFFFFFFF) | ((hi & 0xFFFFFFFFFFFFFFFF) << 64)
+    return [n for n in range(valor.bit_length()) if valor >> n & 1]
+
+
+def para_sqlite(palavra):
+    """O SQLite guarda inteiros de 64 bits com sinal"""
+    return palavra - (1 << 64) if palavra >= 1 << 63 else palavra
+
+
+def de_sqlite(valor):
+    return valor & 0xFFFFFFFFFFFFFFFF
+
+
+def mascaras(jogos):
+    """Converte uma matriz (n, k) de dezenas em uma matriz (n, 2) uint64"""
+    jogos = np.asarray(jogos, dtype=np.uint64)
+    bits = np.left_shift(np.uint64(1), jogos % np.uint64(64))
+    palavra = jogos // np.uint64(64)
+    saida = np.empty((jogos.shape[0], PALAVRAS), dtype=np.uint64)
+    for i in range(PALAVRAS):
+        saida[:, i] = np.bitwise_or.reduce(
+            np.where(palavra == i, bits, np.uint64(0)), axis=1
+        )
+    return saida
+
+
+def acertos(jogos, sorteios):
+    """
+    Matriz (jogos, sorteios) uint8 com a quantidade de dezenas em comum.
+    Chame em blocos de poucas centenas de jogos para a matriz caber no cache.
+    """
+    total = None
+    for i in range(PALAVRAS):
+        # Loterias de até 63 dezenas nunca usam a segunda palavra
+        if not jogos[:, i].any() or not sorteios[:, i].any():
+            continue
+        contagem = np.bitwise_count(
+            np.bitwise_and(jogos[:, i, None], sorteios[None, :, i])
+        )
+        if total is None:
+            total = contagem
+        else:
+            total += contagem
+    if total is None:
+        total = np.zeros((len(jogos), len(sorteios)), dtype=np.uint8)
+    return total
@@ -0,0 +1,67 @@
+"""
+Preços das apostas e faixas de prêmio, montados a partir do LOTTERY_CONFIG.
+
+Uma aposta de N dezenas equivale a comb(N, min_dezenas) apostas simples, então
+custa comb(N, min_dezenas) * preco_base. A tabela de preços de cada loteria
+(indexada pela quantidade de dezenas) é calculada uma vez; as consultas são só
+um índice, inclusive para muitas apostas de uma vez.
+"""
+
+from functools import lru_cache
+from math import comb
+
+import numpy as np
+
+from config import LOTTERY_CONFIG
+
+
+@lru_cache(maxsize=None)
+def tabela_precos(loteria):
+    """Vetor (max_dezenas + 1,) com o preço por quantidade de dezenas; 0 se não permitida"""
+    config = LOTTERY_CONFIG[loteria]
+    tabela = np.zeros(config["max_dezenas"] + 1, dtype=np.float64)
+    for n in range(config["min_dezenas"], config["max_dezenas"] + 1):
+        tabela[n] = comb(n, config["min_dezenas"]) * config["preco_base"]
+    tabela.flags.writeable = False
+    return tabela
+
+
+def calcular_preco(loteria, num_dezenas):
+    """Preço de uma aposta com num_dezenas dezenas (0 se a quantidade não for permitida)"""
+    tabela = tabela_precos(loteria)
+    return float(tabela[num_dezenas]) if 0 <= num_dezenas < len(tabela) else 0.0
+
+
+def calcular_precos(loteria, num_dezenas):
+    """Versão vetorizada: preço de cada aposta de um vetor de quantidades de dezenas"""
+    tabela = tabela_precos(loteria)
+    num_dezenas = np.asarray(num_dezenas, dtype=np.int64)
+    validas = (num_dezenas >= 0) & (num_dezenas < len(tabela))
+    return np.where(validas, tabela[np.where(validas, num_dezenas, 0)], 0.0)
+
+
+def custo_jogos(loteria, jogos):
+    """Custo total de uma lista (ou matriz) de jogos, que podem ter tamanhos diferentes"""
+    if isinstance(jogos, np.ndarray) and jogos.ndim == 2:
+        return calcular_preco(loteria, jogos.shape[1]) * len(jogos)
+    return float(calcular_precos(loteria, [len(jogo) for jogo in jogos]).sum())
+
+
+@lru_cache(maxsize=None)
+def tabela_premiacao(loteria):
+    """Vetor booleano (num_sorteados + 1,): True nas quantidades de acertos premiadas"""
+    config = LOTTERY_CONFIG[loteria]
+    premiado = np.zeros(config["num_sorteados"] + 1, dtype=bool)
+    premiado[list(config["faixas_premio"])] = True
+    premiado.flags.writeable = False
+    return premiado
+
+
+def premiado(loteria, acertos):
+    """Se cada quantidade de acertos (escalar ou vetor) dá prêmio"""
+    return tabela_premiacao(loteria)[acertos]
+
+
+def nome_faixa(loteria, acertos):
+    """Nome da faixa de prêmio, ou None se não houver prêmio com esses acertos"""
+    return LOTTERY_CONFIG[loteria]["faixas_premio"].get(int(acertos))
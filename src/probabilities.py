@@ -0,0 +1,89 @@
+"""
+Probabilidades exatas de acerto (distribuição hipergeométrica).
+
+Apostando N dezenas de um universo de U, com r sorteadas, a chance de
+acertar exatamente k é comb(N, k) * comb(U - N, r - k) / comb(U, r). As
+tabelas são calculadas uma vez por loteria, com Fraction (aritmética
+inteira exata), para todo N entre min_dezenas e max_dezenas; as consultas
+seguintes são só buscas no cache.
+"""
+
+from fractions import Fraction
+from functools import lru_cache
+from math import comb
+
+from config import LOTTERY_CONFIG
+
+
+def _universo(config):
+    """Quantidade de dezenas possíveis (a Lotomania vai de 00 a 99)"""
+    return config["num_total"] + 1 - config.get("menor_dezena", 1)
+
+
+def sorteios_por_concurso(loteria):
+    """A Dupla Sena sorteia duas vezes por concurso"""
+    return 2 if "colunas_numeros_2" in LOTTERY_CONFIG[loteria] else 1
+
+
+@lru_cache(maxsize=None)
+def tabela(loteria):
+    """
+    {num_dezenas: (P(0 acertos), ..., P(r acertos))} com Fractions, para cada
+    aposta permitida da loteria. Probabilidades por sorteio.
+    """
+    config = LOTTERY_CONFIG[loteria]
+    universo = _universo(config)
+    r = config["num_sorteados"]
+    total = comb(universo, r)
+    return {
+        n: tuple(
+            Fraction(comb(n, k) * comb(universo - n, r - k), total)
+            for k in range(r + 1)
+        )
+        for n in range(config["min_dezenas"], config["max_dezenas"] + 1)
+    }
+
+
+def probabilidade(loteria, num_dezenas, acertos):
+    """Chance exata de acertar `acertos` dezenas em um sorteio"""
+    linha = tabela(loteria)[num_dezenas]
+    return linha[acertos] if 0 <= acertos < len(linha) else Fraction(0)
+
+
+@lru_cache(maxsize=None)
+def chances_premio(loteria, num_dezenas):
+    """
+    {acertos: Fraction} com a chance de cada faixa de prêmio por concurso
+    (na Dupla Sena, a de ganhar a faixa em pelo menos um dos dois sorteios).
+    """
+    linha = tabela(loteria)[num_dezenas]
+    sorteios = sorteios_por_concurso(loteria)
+    return {
+        k: 1 - (1 - linha[k]) ** sorteios
+        for k in sorted(LOTTERY_CONFIG[loteria]["faixas_premio"], reverse=True)
+        if k < len(linha)
+    }
+
+
+def chances_bolao(loteria, num_dezenas, num_jogos):
+    """
+    Combina as tabelas sobre um bolão de num_jogos apostas. Para cada faixa,
+    retorna {"esperado": jogos premiados por concurso (exato, Fraction) e
+    "pelo_menos_um": chance de algum jogo ganhar (float)}. Esta última trata
+    os jogos como independentes; para os jogos de fato gerados, use o
+    simulador.
+    """
+    return {
+        k: {
+            "esperado": p * num_jogos,
+            "pelo_menos_um": 1 - (1 - float(p)) ** num_jogos,
+        }
+        for k, p in chances_premio(loteria, num_dezenas).items()
+    }
+
+
+def formatar_chance(p):
+    """"1 em 50.063.860" (ou "impossível" para probabilidade zero)"""
+    if p <= 0:
+        return "impossível"
+    return f"1 em {round(1 / p):,}".replace(",", ".")
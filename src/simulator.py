@@ -0,0 +1,248 @@
+"""
+Simulação de Monte Carlo de um bolão.
+
+Sorteia milhões de resultados sintéticos (uniformes, como os da Caixa) e
+confere todos os jogos do bolão contra cada um com máscaras de bits (AND +
+popcount). Os sorteios são divididos em partes de tamanho fixo, cada uma com
+a sua semente derivada de um SeedSequence, e as partes rodam em um pool de
+processos: com a mesma seed o resultado não depende de quantos processos
+foram usados.
+
+Exemplo (a partir da pasta src):
+    python -m simulator --loteria "Mega-Sena" --arquivo bolao.csv --sorteios 2000000
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from config import LOTTERY_CONFIG
+from masks import mascaras, acertos
+
+logger = logging.getLogger(__name__)
+
+SORTEIOS_PADRAO = 1_000_000
+# Sorteios por tarefa do pool (e por semente)
+TAMANHO_PARTE = 131_072
+# Blocos da conferência: a matriz (jogos, sorteios) de cada bloco cabe no cache
+BLOCO_SORTEIOS = 4096
+BLOCO_JOGOS = 256
+# Quantil da normal para o intervalo de confiança de 95%
+Z_95 = 1.959963984540054
+
+
+def _universo(config):
+    """Dezenas possíveis em um sorteio; a Lotomania vai de 00 a 99"""
+    return np.arange(config.get("menor_dezena", 1), config["num_total"] + 1)
+
+
+def _sortear(rng, n, universo, num_sorteados):
+    """Máscaras (n, 2) de n sorteios uniformes sem reposição"""
+    chaves = rng.random((n, len(universo)), dtype=np.float32)
+    indices = np.argpartition(chaves, num_sorteados - 1, axis=1)[:, :num_sorteados]
+    return mascaras(universo[indices])
+
+
+def _simular_parte(loteria, jogos, n, semente):
+    """
+    Confere os jogos (máscaras) contra n sorteios sintéticos. Executa em um
+    processo do pool. Retorna, somados sobre os sorteios: melhor[k] (sorteios
+    em que o melhor jogo fez k acertos), premiados[i] (jogos que ganharam a
+    i-ésima faixa), por_faixa[i] (sorteios em que algum jogo a ganhou),
+    algum_premio (sorteios com ao menos um prêmio) e a soma de todos os acertos.
+    """
+    config = LOTTERY_CONFIG[loteria]
+    num_sorteados = config["num_sorteados"]
+    universo = _universo(config)
+    faixas = sorted(config["faixas_premio"])
+    rng = np.random.default_rng(semente)
+
+    melhor = np.zeros(num_sorteados + 1, dtype=np.int64)
+    premiados = np.zeros(len(faixas), dtype=np.int64)
+    por_faixa = np.zeros(len(faixas), dtype=np.int64)
+    algum_premio = 0
+    soma_acertos = 0
+    for inicio in range(0, n, BLOCO_SORTEIOS):
+        sorteios = _sortear(
+            rng, min(BLOCO_SORTEIOS, n - inicio), universo, num_sorteados
+        )
+        maximo = np.zeros(len(sorteios), dtype=np.uint8)
+        ganhou = np.zeros((len(faixas), len(sorteios)), dtype=bool)
+        for j in range(0, len(jogos), BLOCO_JOGOS):
+            matriz = acertos(jogos[j : j + BLOCO_JOGOS], sorteios)
+            np.maximum(maximo, matriz.max(axis=0), out=maximo)
+            soma_acertos += int(matriz.sum(dtype=np.uint32))
+            # Só as faixas de prêmio são contadas: um bincount de toda a matriz
+            # custaria mais que a própria conferência
+            for i, k in enumerate(faixas):
+                iguais = matriz == k
+                premiados[i] += np.count_nonzero(iguais)
+                ganhou[i] |= iguais.any(axis=0)
+        melhor += np.bincount(maximo, minlength=num_sorteados + 1)
+        por_faixa += ganhou.sum(axis=1)
+        algum_premio += int(ganhou.any(axis=0).sum())
+    return melhor, premiados, por_faixa, algum_premio, soma_acertos
+
+
+def intervalo_wilson(sucessos, n, z=Z_95):
+    """Intervalo de confiança de Wilson para uma proporção (vale também com 0 sucessos)"""
+    if n == 0:
+        return 0.0, 1.0
+    p = sucessos / n
+    denominador = 1 + z * z / n
+    centro = (p + z * z / (2 * n)) / denominador
+    margem = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominador
+    return max(0.0, centro - margem), min(1.0, centro + margem)
+
+
+def simular(loteria, jogos, sorteios=SORTEIOS_PADRAO, seed=None, max_workers=None):
+    """
+    Simula o bolão (lista ou matriz de jogos) contra `sorteios` resultados.
+    Retorna um dicionário com, por faixa de prêmio, a probabilidade de algum
+    jogo ganhar em um sorteio (com IC de 95%) e o número esperado de jogos
+    premiados; também a distribuição do melhor acerto por sorteio.
+    Na Dupla Sena, cada concurso tem dois sorteios e os números são por sorteio.
+    """
+    config = LOTTERY_CONFIG[loteria]
+    if len(jogos) == 0:
+        raise ValueError("O bolão não tem jogos")
+    if sorteios < 1:
+        raise ValueError("A simulação precisa de pelo menos 1 sorteio")
+    masks = mascaras(np.asarray(jogos))
+
+    tamanhos = [
+        min(TAMANHO_PARTE, sorteios - inicio)
+        for inicio in range(0, sorteios, TAMANHO_PARTE)
+    ]
+    sementes = np.random.SeedSequence(seed).spawn(len(tamanhos))
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tamanhos))
+
+    num_sorteados = config["num_sorteados"]
+    faixas = sorted(config["faixas_premio"])
+    melhor = np.zeros(num_sorteados + 1, dtype=np.int64)
+    premiados = np.zeros(len(faixas), dtype=np.int64)
+    por_faixa = np.zeros(len(faixas), dtype=np.int64)
+    algum_premio = 0
+    soma_acertos = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futuros = [
+            executor.submit(_simular_parte, loteria, masks, n, semente)
+            for n, semente in zip(tamanhos, sementes)
+        ]
+        for futuro in futuros:
+            m, pr, f, a, soma = futuro.result()
+            melhor += m
+            premiados += pr
+            por_faixa += f
+            algum_premio += a
+            soma_acertos += soma
+
+    return {
+        "sorteios": sorteios,
+        "jogos": len(masks),
+        "faixas": {
+            k: {
+                "nome": config["faixas_premio"][k],
+                "probabilidade": int(por_faixa[i]) / sorteios,
+                "intervalo": intervalo_wilson(int(por_faixa[i]), sorteios),
+                "jogos_premiados": int(premiados[i]) / sorteios,
+            }
+            for i, k in enumerate(faixas)
+        },
+        "algum_premio": {
+            "probabilidade": algum_premio / sorteios,
+            "intervalo": intervalo_wilson(algum_premio, sorteios),
+        },
+        "melhor_acerto": melhor.tolist(),
+        "media_acertos": soma_acertos / (sorteios * len(masks)),
+    }
+
+
+def formatar_resultado(resultado):
+    """Tabela em texto com as faixas do resultado de simular()"""
+    linhas = [
+        f"{resultado['jogos']} jogo(s) x {resultado['sorteios']} sorteios simulados",
+        f"{'faixa':<12} {'probabilidade':>14}  {'IC 95%':>27}  {'jogos premiados':>15}",
+    ]
+    for faixa in sorted(resultado["faixas"].values(), key=lambda f: f["probabilidade"]):
+        inferior, superior = faixa["intervalo"]
+        linhas.append(
+            f"{faixa['nome']:<12} {faixa['probabilidade']:>14.8f}  "
+            f"[{inferior:.8f}, {superior:.8f}]  {faixa['jogos_premiados']:>15.6f}"
+        )
+    inferior, superior = resultado["algum_premio"]["intervalo"]
+    linhas.append(
+        f"{'algum prêmio':<12} {resultado['algum_premio']['probabilidade']:>14.8f}  "
+        f"[{inferior:.8f}, {superior:.8f}]"
+    )
+    return "\n".join(linhas)
+
+
+def ler_jogos(caminho):
+    """
+    Um jogo por linha, em qualquer formato de saída do cli (txt, csv com a
+    coluna do número do jogo, jsonl) ou só as dezenas separadas por espaço.
+    """
+    jogos = []
+    with open(caminho, encoding="utf-8") as f:
+        for linha in f:
+            linha = linha.strip()
+            if linha.startswith("{"):
+                dezenas = json.loads(linha)["dezenas"]
+            elif ":" in linha:
+                # "Jogo 01: 06 - 11 - ...": só o que vem depois do ":"
+                dezenas = re.findall(r"\d+", linha.split(":", 1)[1])
+            else:
+                campos = [c for c in re.split(r"[,;\s]+", linha) if c]
+                if not campos or not campos[0].isdigit():
+                    continue  # linha vazia ou cabeçalho
+                dezenas = campos[1:] if re.search(r"[,;]", linha) else campos
+            if dezenas:
+                jogos.append([int(d) for d in dezenas])
+    return jogos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m simulator",
+        description="Simula as chances de prêmio de um bolão contra sorteios aleatórios.",
+    )
+    parser.add_argument("--loteria", choices=list(LOTTERY_CONFIG), default="Mega-Sena")
+    parser.add_argument("--arquivo", required=True, help="Jogos, um por linha")
+    parser.add_argument("--sorteios", type=int, default=SORTEIOS_PADRAO)
+    parser.add_argument("--processos", type=int, help="Processos em paralelo")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+
+    config = LOTTERY_CONFIG[args.loteria]
+    jogos = ler_jogos(args.arquivo)
+    universo = set(_universo(config).tolist())
+    for jogo in jogos:
+        if not set(jogo) <= universo or len(set(jogo)) != len(jogo):
+            parser.error(f"Jogo inválido para {args.loteria}: {jogo}")
+    if not jogos:
+        parser.error("Nenhum jogo encontrado no arquivo")
+    if len({len(jogo) for jogo in jogos}) > 1:
+        parser.error("Todos os jogos do bolão devem ter a mesma quantidade de dezenas")
+
+    resultado = simular(
+        args.loteria,
+        jogos,
+        sorteios=args.sorteios,
+        seed=args.seed,
+        max_workers=args.processos,
+    )
+    print(formatar_resultado(resultado))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
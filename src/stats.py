@@ -0,0 +1,271 @@
+import logging
+from itertools import combinations
+
+import numpy as np
+
+from config import LOTTERY_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Tamanho da tabela esparsa de triplas mais frequentes
+TOP_TRIPLAS = 1000
+
+
+def _posicoes_triplas(num_sorteados):
+    """Matriz (comb(num_sorteados, 3), 3) com as posições de cada tripla de um sorteio"""
+    return np.array(list(combinations(range(num_sorteados), 3)), dtype=np.intp).reshape(
+        -1, 3
+    )
+
+
+def one_hot(bolas, num_total):
+    """Matriz booleana (linhas, num_total) - a coluna 0 ("00" da Lotomania) é descartada"""
+    bolas = np.asarray(bolas)
+    oh = np.zeros((bolas.shape[0], num_total + 1), dtype=bool)
+    oh[np.arange(bolas.shape[0])[:, None], bolas] = True
+    return oh[:, 1:]
+
+
+class EstatisticasLoteria:
+    """Estatísticas acumuladas de uma loteria, atualizadas a cada novo concurso"""
+
+    def __init__(self, loteria):
+        self.loteria = loteria
+        self.config = LOTTERY_CONFIG[loteria]
+        num_total = self.config["num_total"]
+
+        self.num_concursos = 0
+        self.frequencia = np.zeros(num_total, dtype=np.int64)
+        # Índice (cronológico) do último concurso em que cada dezena saiu, -1 se nunca
+        self.ultimo_visto = np.full(num_total, -1, dtype=np.int64)
+        # Atrasos já encerrados: histograma_atrasos[d, dezena - 1] conta as vezes em
+        # que a dezena voltou após d concursos sem sair (a primeira aparição conta
+        # desde o início do histórico). Ganha linhas quando surge um atraso maior
+        self.histograma_atrasos = np.zeros((1, num_total), dtype=np.int64)
+        self._maior_atraso = np.zeros(num_total, dtype=np.int64)
+        # Quantas vezes cada par saiu no mesmo sorteio (a diagonal é a frequência)
+        self.pares = np.zeros((num_total, num_total), dtype=np.int64)
+        # Contagem densa de triplas por sorteio, indexada por (a * B + b) * B + c
+        # com a < b < c e B = num_total + 1; as consultas usam a tabela esparsa
+        self._triplas = np.zeros((num_total + 1) ** 3, dtype=np.int32)
+        self._top_triplas = None
+        # Contagem acumulada: a linha i soma os concursos [0, i). Cresce por
+        # dobra de capacidade para que acrescentar continue O(concursos novos)
+        self._acumulado = np.zeros((1, num_total), dtype=np.int32)
+        # meia_vida -> (concursos já incorporados, frequência decaída)
+        self._decaidas = {}
+
+    @property
+    def atraso(self):
+        """Concursos desde a última aparição de cada dezena (0 = saiu no último)"""
+        return self.num_concursos - 1 - self.ultimo_visto
+
+    @property
+    def maior_atraso(self):
+        """Maior atraso de cada dezena, contando o atraso atual ainda em aberto"""
+        return np.maximum(self._maior_atraso, self.atraso)
+
+    @property
+    def ranking_atrasadas(self):
+        """Dezenas da mais para a menos atrasada"""
+        return np.argsort(-self.atraso, kind="stable") + 1
+
+    @property
+    def acumulado(self):
+        """Matriz (num_concursos + 1, num_total) de contagens acumuladas"""
+        return self._acumulado[: self.num_concursos + 1]
+
+    def frequencia_janela(self, n):
+        """Frequência nos últimos n concursos, em O(num_total)"""
+        inicio = max(0, self.num_concursos - int(n))
+        return self.acumulado[-1] - self.acumulado[inicio]
+
+    def frequencia_decaida(self, meia_vida):
+        """
+        Frequência com peso 0.5 ** (idade / meia_vida) por concurso. O vetor
+        de cada meia-vida fica guardado e só avança sobre os concursos novos.
+        """
+        fator = 0.5 ** (1 / meia_vida)
+        inicio, vetor = self._decaidas.get(
+            meia_vida, (0, np.zeros(self.config["num_total"]))
+        )
+        if inicio < self.num_concursos:
+            contagens = np.diff(self.acumulado[inicio:], axis=0)
+            k = len(contagens)
+            pesos = fator ** np.arange(k - 1, -1, -1, dtype=np.float64)
+            vetor = vetor * fator**k + pesos @ contagens
+            self._decaidas[meia_vida] = (self.num_concursos, vetor)
+        return vetor
+
+    def parceiros(self, dezena, k=None):
+        """
+        Dezenas que mais saíram junto com `dezena`, da mais para a menos
+        frequente. Retorna (dezenas, contagens), limitado a k se informado.
+        """
+        contagens = self.pares[dezena - 1].copy()
+        contagens[dezena - 1] = -1
+        ordem = np.argsort(-contagens, kind="stable")[: len(contagens) - 1]
+        if k is not None:
+            ordem = ordem[:k]
+        return ordem + 1, contagens[ordem]
+
+    def contagem_tripla(self, a, b, c):
+        """Quantos sorteios tiveram as três dezenas juntas"""
+        a, b, c = sorted((int(a), int(b), int(c)))
+        if a == b or b == c:
+            raise ValueError("As três dezenas devem ser distintas")
+        base = self.config["num_total"] + 1
+        return int(self._triplas[(a * base + b) * base + c])
+
+    def terceiras(self, a, b, k=None):
+        """Dezenas que mais completaram o par (a, b): (dezenas, contagens)"""
+        base = self.config["num_total"] + 1
+        a, b = sorted((int(a), int(b)))
+        if a == b:
+            raise ValueError("As duas dezenas devem ser distintas")
+        cubo = self._triplas.reshape(base, base, base)
+        # A terceira dezena pode vir antes, entre ou depois do par
+        contagens = (
+            cubo[:, a, b] + cubo[a, :, b] + cubo[a, b, :]
+        )[1:].astype(np.int64)
+        contagens[[a - 1, b - 1]] = -1
+        ordem = np.argsort(-contagens, kind="stable")[: len(contagens) - 2]
+        if k is not None:
+            ordem = ordem[:k]
+        return ordem + 1, contagens[ordem]
+
+    def triplas_fortes(self, k=TOP_TRIPLAS):
+        """
+        Tabela esparsa das k triplas mais frequentes: (triplas (k, 3) uint8,
+        contagens). Fica guardada até entrarem concursos novos.
+        """
+        if self._top_triplas is None or self._top_triplas[0] != (self.num_concursos, k):
+            k_efetivo = min(k, int(np.count_nonzero(self._triplas)))
+            if k_efetivo:
+                indices = np.argpartition(-self._triplas, k_efetivo - 1)[:k_efetivo]
+                indices = indices[np.argsort(-self._triplas[indices], kind="stable")]
+            else:
+                indices = np.zeros(0, dtype=np.intp)
+            base = self.config["num_total"] + 1
+            triplas = np.stack(
+                (indices // (base * base), indices // base % base, indices % base), axis=1
+            ).astype(np.uint8)
+            self._top_triplas = (
+                (self.num_concursos, k),
+                triplas,
+                self._triplas[indices].astype(np.int64),
+            )
+        return self._top_triplas[1], self._top_triplas[2]
+
+    @property
+    def ranking_quentes(self):
+        """Dezenas da mais para a menos sorteada"""
+        return np.argsort(-self.frequencia, kind="stable") + 1
+
+    @property
+    def ranking_frias(self):
+        """Dezenas da menos para a mais sorteada"""
+        return np.argsort(self.frequencia, kind="stable") + 1
+
+    def acrescentar(self, bolas):
+        """Incorpora novos concursos (linhas de bolas em ordem cronológica)"""
+        bolas = np.asarray(bolas)
+        if len(bolas) == 0:
+            return
+        num_total = self.config["num_total"]
+
+        self.frequencia += np.bincount(bolas.ravel(), minlength=num_total + 1)[1:]
+
+        presenca = one_hot(bolas, num_total)
+        # Último concurso visto até cada linha: máximo acumulado dos índices
+        # em que a dezena saiu, partindo do último visto até aqui
+        linhas = self.num_concursos + np.arange(len(bolas))
+        vistos = np.maximum.accumulate(
+            np.vstack([self.ultimo_visto, np.where(presenca, linhas[:, None], -1)]),
+            axis=0,
+        )
+        concurso, dezena = np.nonzero(presenca)
+        self._contar_atrasos(dezena, linhas[concurso] - vistos[concurso, dezena] - 1)
+        self.ultimo_visto = vistos[-1]
+
+        # Pares contam por sorteio: a Dupla Sena tem dois sorteios por concurso
+        por_sorteio = one_hot(
+            bolas.reshape(-1, self.config["num_sorteados"]), num_total
+        )
+        uns = por_sorteio.astype(np.float32)
+        self.pares += (uns.T @ uns).astype(np.int64)
+        self._contar_triplas(bolas.reshape(-1, self.config["num_sorteados"]))
+
+        contagens = por_sorteio.reshape(len(bolas), -1, num_total).sum(
+            axis=1, dtype=np.int32
+        )
+        fim = self.num_concursos + 1 + len(bolas)
+        if fim > len(self._acumulado):
+            maior = np.zeros(
+                (max(fim, 2 * len(self._acumulado)), num_total), dtype=np.int32
+            )
+            maior[: self.num_concursos + 1] = self.acumulado
+            self._acumulado = maior
+        self._acumulado[self.num_concursos + 1 : fim] = self._acumulado[
+            self.num_concursos
+        ] + np.cumsum(contagens, axis=0)
+
+        self.num_concursos += len(bolas)
+
+    def _contar_atrasos(self, dezenas, atrasos):
+        if len(atrasos) == 0:
+            return
+        num_total = self.config["num_total"]
+        largura = int(atrasos.max()) + 1
+        if largura > len(self.histograma_atrasos):
+            maior = np.zeros((largura, num_total), dtype=np.int64)
+            maior[: len(self.histograma_atrasos)] = self.histograma_atrasos
+            self.histograma_atrasos = maior
+        self.histograma_atrasos[:largura] += np.bincount(
+            atrasos * num_total + dezenas, minlength=largura * num_total
+        ).reshape(largura, num_total)
+        np.maximum.at(self._maior_atraso, dezenas, atrasos)
+
+    def _contar_triplas(self, sorteios):
+        base = self.config["num_total"] + 1
+        ordenados = np.sort(sorteios, axis=1).astype(np.int64)
+        posicoes = _posicoes_triplas(ordenados.shape[1])
+        a, b, c = (ordenados[:, posicoes[:, i]].ravel() for i in range(3))
+        # Descarta o "00" da Lotomania e dezenas repetidas em um mesmo sorteio
+        validas = (a >= 1) & (a < b) & (b < c)
+        indices = ((a * base + b) * base + c)[validas]
+        if len(indices) > len(self._triplas) // 16:
+            self._triplas += np.bincount(indices, minlength=len(self._triplas)).astype(
+                np.int32
+            )
+        else:
+            np.add.at(self._triplas, indices, 1)
+
+
+class StatsStore:
+    """Guarda as estatísticas de cada loteria para que a troca seja só uma consulta"""
+
+    def __init__(self):
+        self._stats = {}
+
+    def obter(self, loteria):
+        return self._stats.get(loteria)
+
+    def sincronizar(self, sorteios):
+        """Calcula ou atualiza incrementalmente as estatísticas a partir dos sorteios"""
+        stats = self._stats.get(sorteios.loteria)
+        if stats is None or stats.num_concursos > len(sorteios):
+            stats = EstatisticasLoteria(sorteios.loteria)
+            self._stats[sorteios.loteria] = stats
+
+        if stats.num_concursos < len(sorteios):
+            stats.acrescentar(sorteios.bolas[stats.num_concursos :])
+        return stats
+
+    def calcular_todas(self, draw_cache):
+        """Pré-calcula as estatísticas de todas as loterias do LOTTERY_CONFIG"""
+        for loteria in LOTTERY_CONFIG:
+            try:
+                self.sincronizar(draw_cache.carregar(loteria))
+            except Exception as e:
+                logger.error(f"Erro ao calcular estatísticas de {loteria}: {e}")
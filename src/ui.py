@@ -2,20 +2,25 @@ import os
 import logging
 from datetime import datetime
 import threading
-import json
-from utils import get_resource_path
 from config import LOTTERY_CONFIG, VERSION, UPDATE_BASE_URL
 from updates import UpdateManager
-from flet.matplotlib_chart import MatplotlibChart
-import matplotlib.pyplot as plt
+from generator import GeradorJogos, JANELA_PADRAO
+from pricing import calcular_preco, custo_jogos
+from charts import CacheGraficos, COR_BASE, COR_TEXTO
+from simulator import simular
+from probabilities import chances_premio, chances_bolao, formatar_chance
 import flet as ft
-import pandas as pd
 import numpy as np
-from math import comb
-import matplotlib
 
-# Configuração para renderização de gráficos
-matplotlib.use("svg")
+# Registros do histórico buscados por vez ao rolar a lista
+TAMANHO_PAGINA_HISTORICO = 20
+# Pares do jogo listados na análise
+PARES_RESUMO = 3
+# Sorteios simulados pelo botão "Simular Bolão"
+SORTEIOS_SIMULACAO = 1_000_000
+
+# O pandas é pesado e só é usado na exportação: é importado na primeira
+# utilização para não atrasar a abertura da janela.
 
 
 class LoteriaUI:
@@ -24,109 +29,111 @@ class LoteriaUI:
         self.config_loteria = LOTTERY_CONFIG
         self.page = None
         self.logger = logging.getLogger(__name__)
-        self.df_atual = None
+        self.sorteios_atual = None
+        self.stats_atual = None
+        self.rng = np.random.default_rng()
+        self.gerador = None
+        self.graficos = CacheGraficos()
+        self.dialogos_analise = {}
+        # Uma conferência de resultados por vez (roda em segundo plano)
+        self._conferencia = threading.Lock()
+        # _aplicar_dados roda na thread da tela e na do carregador
+        self._dados = threading.Lock()
 
     # MÉTODOS DE LÓGICA E DADOS
     # ===================================================================
 
-    def carregar_dados(self):
+    def carregar_dados(self, esperar=True):
+        """
+        Pede os dados da loteria selecionada ao carregador de fundo.
+        Com esperar=False a tela é atualizada quando o carregamento terminar.
+        """
         loteria = self.app.loteria.current.value
-        config = self.config_loteria[loteria]
-        try:
-            xlsx_path = get_resource_path(config["caminho_xlsx"])
-            if not os.path.exists(xlsx_path):
-                raise FileNotFoundError(f"Arquivo {xlsx_path} não encontrado.")
-            self.df_atual = pd.read_excel(xlsx_path, sheet_name=0, skiprows=6)
-            self._atualizar_frequencia_app(self.df_atual, config)
-        except Exception as e:
-            self.logger.error(f"Erro ao carregar dados: {e}")
-            self.app.freq = np.zeros(config["num_total"], dtype=int)
-
-    def _atualizar_frequencia_app(self, df, config):
-        nums = df[config["colunas_numeros"]].values.flatten()
-        if "colunas_numeros_2" in config:
-            nums2 = df[config["colunas_numeros_2"]].values.flatten()
-            nums = np.concatenate([nums, nums2])
-
-        nums = nums[~np.isnan(nums)].astype(int)
-        self.app.freq = np.bincount(nums, minlength=config["num_total"] + 1)[1:]
+        futuro = self.app.loader.carregar(loteria)
+        if esperar:
+            self._aplicar_dados(loteria, futuro)
+        else:
+            futuro.add_done_callback(
+                lambda f: self._aplicar_dados(loteria, f, atualizar_pagina=True)
+            )
+
+    def _aplicar_dados(self, loteria, futuro, atualizar_pagina=False):
+        with self._dados:
+            # O usuário pode ter trocado de loteria enquanto os dados carregavam
+            if loteria != self.app.loteria.current.value:
+                return
+            if self.gerador is not None and self.gerador.loteria == loteria:
+                return
+
+            config = self.config_loteria[loteria]
+            try:
+                self.sorteios_atual, self.stats_atual = futuro.result()
+                self.app.freq = self.stats_atual.frequencia
+            except Exception as e:
+                self.logger.error(f"Erro ao carregar dados: {e}")
+                self.sorteios_atual = None
+                self.stats_atual = None
+                self.app.freq = np.zeros(config["num_total"], dtype=int)
+            self.gerador = GeradorJogos(
+                loteria, self.app.freq, self.rng, stats=self.stats_atual
+            )
+        if atualizar_pagina and self.page:
+            self.page.update()
+
+    def _progresso_carregamento(self, loteria, concluidas, total, erro):
+        if erro:
+            self.progresso_txt.value = f"⚠️ Falha ao carregar {loteria}"
+        else:
+            self.progresso_txt.value = (
+                f"Carregando histórico das loterias... {concluidas}/{total}"
+            )
+        self.progresso_bar.value = concluidas / total if total else None
+        self.progresso_box.visible = concluidas < total or bool(erro)
+        if self.page:
+            self.page.update()
 
     def calcular_preco(self, num_dezenas):
-        loteria = self.app.loteria.current.value
-        config = self.config_loteria[loteria]
+        return calcular_preco(self.app.loteria.current.value, num_dezenas)
+
+    def _janela(self):
         try:
-            if loteria == "Mega-Sena":
-                num_combs = comb(num_dezenas, 6)
-            elif loteria == "Loto Fácil":
-                num_combs = comb(num_dezenas, 15)
-            elif loteria == "Quina":
-                num_combs = comb(num_dezenas, 5)
-            elif loteria == "Dupla Sena":
-                num_combs = comb(num_dezenas, 6)
-            elif loteria == "Loto Mania":
-                return config["preco_base"]
-            return num_combs * config["preco_base"]
-        except:
-            return 0
+            return max(1, int(self.janela_field.value))
+        except (TypeError, ValueError):
+            return JANELA_PADRAO
 
     def gerar_numeros(self, metodo, num_dezenas):
-        loteria = self.app.loteria.current.value
-        config = self.config_loteria[loteria]
         try:
-            # Se for Surpresinha ou não tiver dados, faz sorteio 100% aleatório
-            if (
-                metodo == "surpresinha"
-                or len(self.app.freq) == 0
-                or np.all(self.app.freq == 0)
-            ):
-                return sorted(
-                    np.random.choice(
-                        range(1, config["num_total"] + 1),
-                        size=num_dezenas,
-                        replace=False,
-                    ).tolist()
-                )
-
-            numeros_ordenados = (
-                np.argsort(self.app.freq)[::-1] + 1
-            )  # Mais frequentes no início
-
-            # Define o tamanho do "pote" de números a considerar
-            if loteria == "Loto Mania":
-                limite = 75
-            elif loteria in ["Mega-Sena", "Quina", "Dupla Sena"]:
-                limite = 40
-            else:
-                limite = 20
-            limite = max(
-                limite, num_dezenas + 5
-            )  # Garante que haja números suficientes
-
-            if metodo == "top_frequentes":
-                # Pega os primeiros do ranking (os que mais saem)
-                top = numeros_ordenados[:limite]
-                selecionados = np.random.choice(top, size=num_dezenas, replace=False)
-
-            elif metodo == "menos_frequentes":
-                # Pega os últimos do ranking (os que menos saem / mais atrasados)
-                frias = numeros_ordenados[-limite:]
-                selecionados = np.random.choice(frias, size=num_dezenas, replace=False)
-
-            elif metodo == "probabilistico":
-                # Sorteio viciado: quem sai mais tem maior probabilidade de ser escolhido
-                probs = self.app.freq / self.app.freq.sum()
-                selecionados = np.random.choice(
-                    range(1, config["num_total"] + 1),
-                    size=num_dezenas,
-                    replace=False,
-                    p=probs,
-                )
-
-            return sorted([int(x) for x in selecionados])
+            return self.gerador.gerar_numeros(metodo, num_dezenas, self._janela())
         except Exception as ex:
             self.logger.error(f"Erro gerar_numeros: {ex}")
             return []
 
+    def gerar_lote(self, metodo, num_dezenas, n):
+        """Gera n jogos de uma vez: matriz (n, num_dezenas) uint8"""
+        try:
+            return self.gerador.gerar_lote(metodo, num_dezenas, n, self._janela())
+        except Exception as ex:
+            self.logger.error(f"Erro gerar_lote: {ex}")
+            return np.empty((0, num_dezenas), dtype=np.uint8)
+
+    def gerar_bolao(self, metodo, num_dezenas, n, max_comum=None):
+        """Como gerar_lote, mas sem repetidos e com sobreposição limitada"""
+        try:
+            return self.gerador.gerar_bolao(
+                metodo, num_dezenas, n, self._janela(), max_comum
+            )
+        except ValueError as ex:
+            self.show_snackbar(f"⚠️ {ex}", "#ef4444")
+        except Exception as ex:
+            self.logger.error(f"Erro gerar_bolao: {ex}")
+        return np.empty((0, num_dezenas), dtype=np.uint8)
+
+    def _max_comum(self):
+        try:
+            return int(self.max_comum_field.value)
+        except (TypeError, ValueError):
+            return None
+
     # MÉTODOS DE UI E UTILITÁRIOS
     # ===================================================================
 
@@ -145,10 +152,104 @@ class LoteriaUI:
         self.page.set_clipboard(texto)
         self.show_snackbar("📋 Copiado para área de transferência!", "#3b82f6")
 
+    def simular_bolao(self, e):
+        """Roda a simulação de Monte Carlo dos jogos atuais sem travar a interface"""
+        if not self.app.jogos_atuais:
+            return
+        loteria = self.app.loteria.current.value
+        jogos = list(self.app.jogos_atuais)
+        if e is not None and e.control is not None:
+            e.control.disabled = True
+        self.show_snackbar(
+            f"🎯 Simulando {len(jogos)} jogo(s) contra {SORTEIOS_SIMULACAO:,} sorteios...".replace(
+                ",", "."
+            ),
+            "#3b82f6",
+        )
+
+        def tarefa():
+            try:
+                resultado = simular(loteria, jogos, sorteios=SORTEIOS_SIMULACAO)
+                self.page.open(self._dialogo_simulacao(loteria, resultado))
+            except Exception as ex:
+                self.logger.error(f"Erro na simulação: {ex}")
+                self.show_snackbar("Erro ao simular o bolão.", "#ef4444")
+            finally:
+                if e is not None and e.control is not None:
+                    e.control.disabled = False
+                self.page.update()
+
+        threading.Thread(target=tarefa, daemon=True).start()
+
+    def _dialogo_simulacao(self, loteria, resultado):
+        linhas = []
+        for faixa in sorted(
+            resultado["faixas"].values(), key=lambda f: f["probabilidade"]
+        ):
+            inferior, superior = faixa["intervalo"]
+            linhas.append(
+                ft.Row(
+                    [
+                        ft.Text(faixa["nome"], color="black", weight="bold", expand=2),
+                        ft.Text(
+                            f"{faixa['probabilidade'] * 100:.4f}%", color="black", expand=2
+                        ),
+                        ft.Text(
+                            f"{inferior * 100:.4f}% a {superior * 100:.4f}%",
+                            color=COR_TEXTO,
+                            expand=3,
+                        ),
+                        ft.Text(
+                            f"{faixa['jogos_premiados']:.4f}", color="black", expand=2
+                        ),
+                    ]
+                )
+            )
+        cabecalho = ft.Row(
+            [
+                ft.Text(t, color=COR_TEXTO, size=12, expand=x)
+                for t, x in (
+                    ("Faixa", 2),
+                    ("Chance por sorteio", 2),
+                    ("IC 95%", 3),
+                    ("Jogos premiados (média)", 2),
+                )
+            ]
+        )
+        algum = resultado["algum_premio"]
+        rodape = ft.Text(
+            f"Chance de algum prêmio: {algum['probabilidade'] * 100:.4f}% | "
+            f"Média de acertos por jogo: {resultado['media_acertos']:.3f}",
+            color="black",
+            weight="bold",
+        )
+        aviso = ft.Text(
+            f"{resultado['jogos']} jogo(s) contra {resultado['sorteios']:,} sorteios "
+            "aleatórios".replace(",", ".")
+            + (" (a Dupla Sena tem dois sorteios por concurso)" if loteria == "Dupla Sena" else ""),
+            color=COR_TEXTO,
+            size=12,
+        )
+        dlg = ft.AlertDialog(
+            title=ft.Text("Simulação do Bolão", weight="bold", color="black", size=22),
+            content=ft.Column(
+                [aviso, cabecalho, *linhas, ft.Divider(), rodape],
+                width=700,
+                tight=True,
+                spacing=10,
+            ),
+            bgcolor="#ffffff",
+            shape=ft.RoundedRectangleBorder(radius=16),
+        )
+        dlg.actions = [ft.TextButton("Fechar", on_click=lambda e: self.page.close(dlg))]
+        return dlg
+
     def exportar_excel(self, e):
         if not self.app.jogos_atuais:
             return
         try:
+            import pandas as pd
+
             filename = f"Bolao_{self.app.loteria.current.value}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
             pd.DataFrame(self.app.jogos_atuais).to_excel(filename)
             self.show_snackbar(f"✅ Exportado: {filename}", "#10b981")
@@ -174,17 +275,58 @@ class LoteriaUI:
         self.dezenas_slider.disabled = min_v == max_v
         self.dezenas_slider.label = "{value} dezenas"
 
+        with self._dados:
+            self.sorteios_atual = None
+            self.stats_atual = None
+            self.gerador = None
         self.atualizar_label_dezenas()
-        self.carregar_dados()
+        self.carregar_dados(esperar=False)
         self.page.update()
 
-    def atualizar_label_dezenas(self, e=None):
-        self.dezenas_info.value = (
-            f"R$ {self.calcular_preco(int(self.dezenas_slider.value)):.2f}"
+    def atualizar_metodo(self, e=None):
+        self.janela_field.visible = self.app.metodo.current.value in (
+            "Janela Recente",
+            "Decaimento Exponencial",
         )
         if self.page:
             self.page.update()
 
+    def atualizar_label_dezenas(self, e=None):
+        num_dezenas = int(self.dezenas_slider.value)
+        self.dezenas_info.value = f"R$ {self.calcular_preco(num_dezenas):.2f}"
+        self.chances_info.value = self._texto_chances(num_dezenas)
+        if self.page:
+            self.page.update()
+
+    def _texto_chances(self, num_dezenas):
+        """Chances exatas de cada faixa (tabelas em cache, sem recalcular a cada tique)"""
+        loteria = self.app.loteria.current.value
+        faixas = self.config_loteria[loteria]["faixas_premio"]
+        if not (
+            self.config_loteria[loteria]["min_dezenas"]
+            <= num_dezenas
+            <= self.config_loteria[loteria]["max_dezenas"]
+        ):
+            return ""
+        num_jogos = 1
+        if self.app.is_bolao.current is not None and self.app.is_bolao.current.value:
+            try:
+                num_jogos = max(1, int(self.app.num_jogos.current.value))
+            except (TypeError, ValueError):
+                pass
+        if num_jogos == 1:
+            chances = chances_premio(loteria, num_dezenas)
+            prefixo = "Chances por concurso: "
+        else:
+            chances = {
+                k: c["pelo_menos_um"]
+                for k, c in chances_bolao(loteria, num_dezenas, num_jogos).items()
+            }
+            prefixo = f"Chances do bolão ({num_jogos} jogos): "
+        return prefixo + " · ".join(
+            f"{faixas[k]} {formatar_chance(p)}" for k, p in chances.items()
+        )
+
     def gerar_jogos(self, e):
         self.gerar_btn.disabled = True
         self.page.update()
@@ -192,19 +334,26 @@ class LoteriaUI:
         self.resumo_content.controls.clear()
         self.app.jogos_atuais = []
         try:
+            # Espera o carregamento em andamento em vez de gerar sem dados
+            self.carregar_dados()
             num_jogos = (
                 int(self.app.num_jogos.current.value)
                 if self.app.is_bolao.current.value
                 else 1
             )
             config = self.config_loteria[self.app.loteria.current.value]
-            for i in range(num_jogos):
-                nums = self.gerar_numeros(
-                    self.app.metodo.current.value.lower().replace(" ", "_"),
-                    int(self.dezenas_slider.value),
+            metodo = self.app.metodo.current.value.lower().replace(" ", "_")
+            # Modo opcional: só quando marcado ou com limite de dezenas em comum
+            if self.app.is_bolao.current.value and (
+                self.sem_repetidos_check.value or self._max_comum() is not None
+            ):
+                lote = self.gerar_bolao(
+                    metodo, int(self.dezenas_slider.value), num_jogos, self._max_comum()
                 )
-                if not nums:
-                    continue
+            else:
+                lote = self.gerar_lote(metodo, int(self.dezenas_slider.value), num_jogos)
+            for i, jogo in enumerate(lote):
+                nums = jogo.tolist()
                 self.app.jogos_atuais.append(nums)
 
                 self.numeros_grid.controls.append(
@@ -277,7 +426,7 @@ class LoteriaUI:
                     )
                 )
 
-            custo = self.calcular_preco(int(self.dezenas_slider.value)) * num_jogos
+            custo = custo_jogos(self.app.loteria.current.value, lote)
             part = int(self.app.num_participantes.current.value or 1)
 
             # Resumo Financeiro mais limpo
@@ -308,6 +457,14 @@ class LoteriaUI:
                             ],
                             expand=True,
                         ),
+                        ft.ElevatedButton(
+                            "🎯 Simular Bolão",
+                            on_click=self.simular_bolao,
+                            bgcolor="#2563eb",
+                            color="white",
+                            height=50,
+                            tooltip="Chances de prêmio dos jogos em sorteios simulados",
+                        ),
                         ft.ElevatedButton(
                             "📊 Exportar Excel",
                             on_click=self.exportar_excel,
@@ -327,32 +484,58 @@ class LoteriaUI:
     # ANÁLISE DE JOGO (GRÁFICO)
     # ===================================================================
     def analisar_jogo(self, jogo):
-        if self.df_atual is None:
-            self.show_snackbar("Aguarde o carregamento dos dados.", "#ef4444")
+        self.carregar_dados()
+        if self.sorteios_atual is None:
+            self.show_snackbar("Histórico da loteria indisponível.", "#ef4444")
             return
 
-        config = self.config_loteria[self.app.loteria.current.value]
-        fig, ax = plt.subplots(figsize=(10, 4.5))
-        fig.patch.set_facecolor("white")
-        ax.set_facecolor("white")
-
-        cores = ["#e2e8f0"] * config["num_total"]
-        for n in jogo:
-            if 1 <= n <= config["num_total"]:
-                cores[n - 1] = config["cor_bola"]
+        loteria = self.app.loteria.current.value
+        # O gráfico só é remontado quando chegam sorteios novos
+        chave = self.stats_atual.num_concursos if self.stats_atual is not None else 0
+        grafico, substituido = self.graficos.obter(loteria, self.app.freq, chave)
+        grafico.destacar(jogo)
 
-        ax.bar(range(1, config["num_total"] + 1), self.app.freq, color=cores, width=0.8)
+        dlg = self.dialogos_analise.get(loteria)
+        if dlg is None or substituido is not None:
+            if dlg is not None and dlg in self.page.overlay:
+                # Libera o diálogo do gráfico antigo
+                self.page.overlay.remove(dlg)
+            dlg = self._dialogo_analise(grafico)
+            self.dialogos_analise[loteria] = dlg
+        # dlg.data é o texto com o resumo do jogo, trocado a cada análise
+        dlg.data.value = self._resumo_jogo(jogo)
+        self.page.open(dlg)
 
-        ax.spines["top"].set_visible(False)
-        ax.spines["right"].set_visible(False)
-        ax.spines["left"].set_color("#cbd5e1")
-        ax.spines["bottom"].set_color("#cbd5e1")
-        ax.set_xlabel("Dezenas", fontsize=11, color="#475569")
-        ax.set_ylabel("Frequência (Vezes Sorteado)", fontsize=11, color="#475569")
-        ax.tick_params(colors="#475569")
+    def _resumo_jogo(self, jogo):
+        """Atraso de cada dezena do jogo e os pares que mais saíram juntos"""
+        if self.stats_atual is None:
+            return ""
+        jogo = [int(n) for n in jogo if int(n) >= 1]
+        atraso = self.stats_atual.atraso
+        maior = self.stats_atual.maior_atraso
+        linhas = [
+            "Concursos sem sair (maior atraso): "
+            + ", ".join(f"{n:02d}: {atraso[n - 1]} ({maior[n - 1]})" for n in jogo)
+        ]
+        pares = sorted(
+            (
+                (int(self.stats_atual.pares[a - 1, b - 1]), a, b)
+                for i, a in enumerate(jogo)
+                for b in jogo[i + 1 :]
+            ),
+            reverse=True,
+        )[:PARES_RESUMO]
+        if pares:
+            linhas.append(
+                "Pares mais sorteados juntos: "
+                + ", ".join(f"{a:02d}-{b:02d} ({n}x)" for n, a, b in pares)
+            )
+        return "\n".join(linhas)
 
+    def _dialogo_analise(self, grafico):
+        config = grafico.config
         chart_box = ft.Container(
-            content=MatplotlibChart(fig, expand=True, transparent=True),
+            content=grafico.controle,
             height=350,
             padding=10,
         )
@@ -368,7 +551,7 @@ class LoteriaUI:
                 ft.Container(
                     width=16,
                     height=16,
-                    bgcolor="#e2e8f0",
+                    bgcolor=COR_BASE,
                     border_radius=4,
                     margin=ft.margin.only(left=20),
                 ),
@@ -376,27 +559,189 @@ class LoteriaUI:
             ],
             alignment=ft.MainAxisAlignment.CENTER,
         )
+        resumo = ft.Text("", color=COR_TEXTO, size=13)
 
         dlg = ft.AlertDialog(
             title=ft.Text(
                 f"Análise de Força do Jogo", weight="bold", color="black", size=22
             ),
-            content=ft.Column([legenda, chart_box], width=900, height=420, spacing=15),
+            content=ft.Column(
+                [legenda, chart_box, resumo],
+                width=900,
+                height=500,
+                spacing=15,
+                scroll=ft.ScrollMode.AUTO,
+            ),
             bgcolor="#ffffff",
             shape=ft.RoundedRectangleBorder(radius=16),
+            data=resumo,
         )
         dlg.actions = [
             ft.TextButton("Fechar Gráfico", on_click=lambda e: self.page.close(dlg))
         ]
-        self.page.open(dlg)
+        return dlg
 
     # HISTÓRICO E UPDATES
     # ===================================================================
+    def _conferir_resultados(self):
+        """Confere os jogos salvos com os sorteios (só o que ainda não foi conferido)"""
+        for loteria in self.config_loteria:
+            try:
+                sorteios, _ = self.app.loader.carregar(loteria).result()
+                self.app.checker.conferir(loteria, sorteios)
+            except Exception as ex:
+                self.logger.error(f"Erro ao conferir {loteria}: {ex}")
+
+    def _texto_premios(self, loteria, premios):
+        faixas = self.config_loteria.get(loteria, {}).get("faixas_premio", {})
+        partes = [
+            f"{premios[acertos]}x {faixas.get(acertos, f'{acertos} acertos')}"
+            for acertos in sorted(premios, reverse=True)
+        ]
+        return "🏆 " + ", ".join(partes)
+
+    def _cartao_historico(self, j, lista, premios=None):
+        nums = j[3]
+        cor_loto = self.config_loteria.get(j[1], {}).get("cor_bola", "#333333")
+
+        premios_txt = ft.Text(
+            self._texto_premios(j[1], premios) if premios else "",
+            color="#b45309",
+            weight="bold",
+            size=14,
+            visible=bool(premios),
+        )
+
+        def excluir(_, id=j[0]):
+            if self.app.db_manager.excluir_jogo(id):
+                lista.controls.remove(cartao)
+                self.page.update()
+
+        cartao = ft.Container(
+            content=ft.Column(
+                [
+                    ft.Row(
+                        [
+                            ft.Text(
+                                f"{j[1]} - {j[9][:10]}",
+                                weight="bold",
+                                color="black",
+                                size=16,
+                            ),
+                            ft.Row(
+                                [
+                                    ft.Text(
+                                        f"R$ {j[5]:.2f}",
+                                        color="#059669",
+                                        weight="bold",
+                                        size=16,
+                                    ),
+                                    ft.IconButton(
+                                        ft.Icons.DELETE_OUTLINE,
+                                        icon_color="#ef4444",
+                                        on_click=excluir,
+                                    ),
+                                ]
+                            ),
+                        ],
+                        alignment="spaceBetween",
+                    ),
+                    ft.Row(
+                        [
+                            ft.Container(
+                                content=ft.Text(
+                                    f"{n:02d}",
+                                    color="white",
+                                    size=12,
+                                    weight="bold",
+                                ),
+                                bgcolor=cor_loto,
+                                width=28,
+                                height=28,
+                                border_radius=14,
+                                alignment=ft.alignment.center,
+                            )
+                            for n in nums
+                        ],
+                        wrap=True,
+                        spacing=5,
+                    ),
+                    premios_txt,
+                ]
+            ),
+            padding=15,
+            border_radius=12,
+            bgcolor="#f8fafc",
+            border=ft.border.all(1, "#e2e8f0"),
+            # Usado para atualizar os prêmios quando a conferência terminar
+            data=(j[0], j[1], premios_txt),
+        )
+        return cartao
+
+    def _atualizar_premios(self, lista):
+        """Relê os prêmios dos cartões já exibidos depois de uma conferência"""
+        cartoes = list(lista.controls)
+        premios = self.app.db_manager.premios_por_jogo([c.data[0] for c in cartoes])
+        for cartao in cartoes:
+            jogo_id, loteria, texto = cartao.data
+            p = premios.get(jogo_id)
+            texto.value = self._texto_premios(loteria, p) if p else ""
+            texto.visible = bool(p)
+
+    def _conferir_em_segundo_plano(self, lista):
+        """Confere os jogos fora da thread da interface e atualiza os prêmios no fim"""
+        if not self._conferencia.acquire(blocking=False):
+            return  # Já há uma conferência em andamento
+
+        def tarefa():
+            try:
+                self._conferir_resultados()
+                self._atualizar_premios(lista)
+                self.page.update()
+            except Exception as ex:
+                self.logger.error(f"Erro ao atualizar prêmios: {ex}")
+            finally:
+                self.app.db_manager.fechar_conexao_thread()
+                self._conferencia.release()
+
+        threading.Thread(target=tarefa, daemon=True).start()
+
     def abrir_historico(self, e):
         try:
-            jogos = self.app.db_manager.carregar_historico()
             stats = self.app.db_manager.get_estatisticas()
-            lista = ft.Column(spacing=12, scroll=ft.ScrollMode.AUTO, expand=True)
+            # Só a página visível é montada; as próximas chegam com a rolagem
+            estado = {"cursor": None, "fim": False, "carregando": False}
+            lista = ft.ListView(spacing=12, expand=True)
+
+            def carregar_pagina(e=None):
+                if estado["fim"] or estado["carregando"]:
+                    return
+                estado["carregando"] = True
+                try:
+                    jogos, estado["cursor"] = (
+                        self.app.db_manager.carregar_historico_pagina(
+                            TAMANHO_PAGINA_HISTORICO, estado["cursor"]
+                        )
+                    )
+                    estado["fim"] = estado["cursor"] is None
+                    premios = self.app.db_manager.premios_por_jogo(
+                        [j[0] for j in jogos]
+                    )
+                    for j in jogos:
+                        lista.controls.append(
+                            self._cartao_historico(j, lista, premios.get(j[0]))
+                        )
+                    if e is not None:
+                        self.page.update()
+                finally:
+                    estado["carregando"] = False
+
+            def ao_rolar(e):
+                if e.pixels >= e.max_scroll_extent - 200:
+                    carregar_pagina(e)
+
+            lista.on_scroll = ao_rolar
+            carregar_pagina()
 
             dlg = ft.AlertDialog(
                 title=ft.Text(
@@ -430,81 +775,9 @@ class LoteriaUI:
             dlg.actions = [
                 ft.TextButton("Fechar", on_click=lambda e: self.page.close(dlg))
             ]
-
-            for j in jogos:
-                nums_raw = json.loads(j[3])
-                nums = (
-                    nums_raw[0]
-                    if len(nums_raw) > 0 and isinstance(nums_raw[0], list)
-                    else nums_raw
-                )
-                cor_loto = self.config_loteria.get(j[1], {}).get("cor_bola", "#333333")
-
-                lista.controls.append(
-                    ft.Container(
-                        content=ft.Column(
-                            [
-                                ft.Row(
-                                    [
-                                        ft.Text(
-                                            f"{j[1]} - {j[9][:10]}",
-                                            weight="bold",
-                                            color="black",
-                                            size=16,
-                                        ),
-                                        ft.Row(
-                                            [
-                                                ft.Text(
-                                                    f"R$ {j[5]:.2f}",
-                                                    color="#059669",
-                                                    weight="bold",
-                                                    size=16,
-                                                ),
-                                                ft.IconButton(
-                                                    ft.Icons.DELETE_OUTLINE,
-                                                    icon_color="#ef4444",
-                                                    on_click=lambda _, id=j[0]: (
-                                                        self.app.db_manager.excluir_jogo(
-                                                            id
-                                                        ),
-                                                        self.page.close(dlg),
-                                                        self.abrir_historico(None),
-                                                    ),
-                                                ),
-                                            ]
-                                        ),
-                                    ],
-                                    alignment="spaceBetween",
-                                ),
-                                ft.Row(
-                                    [
-                                        ft.Container(
-                                            content=ft.Text(
-                                                f"{n:02d}",
-                                                color="white",
-                                                size=12,
-                                                weight="bold",
-                                            ),
-                                            bgcolor=cor_loto,
-                                            width=28,
-                                            height=28,
-                                            border_radius=14,
-                                            alignment=ft.alignment.center,
-                                        )
-                                        for n in nums
-                                    ],
-                                    wrap=True,
-                                    spacing=5,
-                                ),
-                            ]
-                        ),
-                        padding=15,
-                        border_radius=12,
-                        bgcolor="#f8fafc",
-                        border=ft.border.all(1, "#e2e8f0"),
-                    )
-                )
             self.page.open(dlg)
+            # A conferência (que espera o histórico das loterias) não trava a abertura
+            self._conferir_em_segundo_plano(lista)
         except Exception as ex:
             self.show_snackbar(f"Erro ao abrir histórico: {ex}", "#ef4444")
 
@@ -517,9 +790,32 @@ class LoteriaUI:
             if res.get("update_available"):
                 
                 def acao_atualizar(e):
+                    # Troca o conteúdo do diálogo pelo progresso do download
+                    barra = ft.ProgressBar(value=0, color="#3b82f6", width=400)
+                    texto = ft.Text("Iniciando download...", color="black", size=14)
+                    dlg.content = ft.Column([texto, barra], tight=True, spacing=10)
+                    dlg.actions = []
+                    self.page.update()
+
+                    def progresso(baixados, total):
+                        mb = baixados / (1024 * 1024)
+                        if total:
+                            barra.value = baixados / total
+                            texto.value = f"Baixando: {mb:.1f} de {total / (1024 * 1024):.1f} MB"
+                        else:
+                            barra.value = None
+                            texto.value = f"Baixando: {mb:.1f} MB"
+                        self.page.update()
+
+                    # Baixa a atualização (com retomada e verificação) e cria o script
+                    sucesso = self.app.update_manager.download_and_install(
+                        res["download_url"],
+                        sha256=res.get("sha256"),
+                        checksum_url=res.get("checksum_url"),
+                        progress_callback=progresso,
+                        patch_url=res.get("patch_url"),
+                    )
                     self.page.close(dlg)
-                    # Baixa a atualização e cria o script
-                    sucesso = self.app.update_manager.download_and_install(res["download_url"])
                     
                     if sucesso:
                         # FORÇA O FECHAMENTO IMEDIATO DO APP PARA LIBERAR O ARQUIVO!
@@ -579,7 +875,24 @@ class LoteriaUI:
             active_color="#2563eb",
         )
         self.dezenas_info = ft.Text("R$ 5.00", color="#059669", weight="bold", size=18)
+        self.chances_info = ft.Text("", color=COR_TEXTO, size=12)
+        # Só aparece nos métodos que olham para os concursos recentes
+        self.janela_field = ft.TextField(
+            label="Concursos Recentes (janela / meia-vida)",
+            value=str(JANELA_PADRAO),
+            keyboard_type=ft.KeyboardType.NUMBER,
+            visible=False,
+            color="black",
+            label_style=ft.TextStyle(color="black", weight="bold", size=16),
+        )
         self.numeros_grid = ft.ResponsiveRow(spacing=20, run_spacing=20)
+        self.progresso_txt = ft.Text(
+            "Carregando histórico das loterias...", color="#475569", size=13
+        )
+        self.progresso_bar = ft.ProgressBar(value=None, color="#2563eb")
+        self.progresso_box = ft.Column(
+            [self.progresso_txt, self.progresso_bar], spacing=5
+        )
         self.resumo_content = ft.Column()
 
         lbl_style = ft.TextStyle(color="black", weight="bold", size=16)
@@ -637,24 +950,48 @@ class LoteriaUI:
             shadow=ft.BoxShadow(blur_radius=5, color="#1A000000"),
         )
 
-        self.bolao_container = ft.Row(
+        self.sem_repetidos_check = ft.Checkbox(
+            label="Sem jogos repetidos",
+            value=False,
+            label_style=ft.TextStyle(color="black", size=14),
+            check_color="white",
+            active_color="#2563eb",
+            tooltip="Cada jogo é diferente dos outros e o bolão espalha as dezenas",
+        )
+        self.max_comum_field = ft.TextField(
+            label="Máx. Dezenas em Comum",
+            hint_text="Sem limite",
+            keyboard_type=ft.KeyboardType.NUMBER,
+            expand=True,
+            color="black",
+            label_style=ft.TextStyle(color="black", weight="bold", size=14),
+        )
+
+        self.bolao_container = ft.Column(
             [
-                ft.TextField(
-                    ref=self.app.num_jogos,
-                    label="Qtde de Jogos",
-                    value="1",
-                    expand=True,
-                    color="black",
-                    label_style=lbl_style,
-                ),
-                ft.TextField(
-                    ref=self.app.num_participantes,
-                    label="Pessoas no Bolão",
-                    value="1",
-                    expand=True,
-                    color="black",
-                    label_style=lbl_style,
+                ft.Row(
+                    [
+                        ft.TextField(
+                            ref=self.app.num_jogos,
+                            label="Qtde de Jogos",
+                            value="1",
+                            on_change=self.atualizar_label_dezenas,
+                            expand=True,
+                            color="black",
+                            label_style=lbl_style,
+                        ),
+                        ft.TextField(
+                            ref=self.app.num_participantes,
+                            label="Pessoas no Bolão",
+                            value="1",
+                            expand=True,
+                            color="black",
+                            label_style=lbl_style,
+                        ),
+                    ],
+                    spacing=15,
                 ),
+                ft.Row([self.sem_repetidos_check, self.max_comum_field], spacing=15),
             ],
             visible=False,
             spacing=15,
@@ -692,10 +1029,16 @@ class LoteriaUI:
                             ft.dropdown.Option(
                                 "Surpresinha"
                             ),  # Algoritmo Novo (Aleatório)
+                            ft.dropdown.Option("Janela Recente"),
+                            ft.dropdown.Option("Decaimento Exponencial"),
+                            ft.dropdown.Option("Pares Fortes"),
+                            ft.dropdown.Option("Mais Atrasadas"),
                         ],
                         value="Top Frequentes",
+                        on_change=self.atualizar_metodo,
                         color="black",
                     ),
+                    self.janela_field,
                     ft.Row(
                         [
                             ft.Text(
@@ -709,12 +1052,14 @@ class LoteriaUI:
                         alignment="spaceBetween",
                     ),
                     self.dezenas_slider,
+                    self.chances_info,
+                    self.progresso_box,
                     ft.Checkbox(
                         ref=self.app.is_bolao,
                         label="Ativar Múltiplos Jogos / Bolão",
                         on_change=lambda e: (
                             setattr(self.bolao_container, "visible", e.control.value),
-                            page.update(),
+                            self.atualizar_label_dezenas(),
                         ),
                         label_style=lbl_style,
                         check_color="white",
@@ -814,5 +1159,10 @@ class LoteriaUI:
                 expand=True,
             )
         )
+        # A janela já foi desenhada: os dados só são carregados a partir daqui
+        if self.app.perfil:
+            self.app.perfil.registrar(self.logger)
+        self.app.loader.ouvintes.append(self._progresso_carregamento)
+        self.app.loader.prefetch_todas(primeira=self.app.loteria.current.value)
         self.atualizar_dezenas(None)
         self.verificar_atualizacao_auto()
@@ -1,6 +1,8 @@
-import requests
 import platform
 import os
+import time
+import json
+import hashlib
 import logging
 from packaging import version
 import sys
@@ -9,13 +11,28 @@ import subprocess
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Download chunk size adapts to throughput, aiming for ~CHUNK_TARGET_SECONDS per read
+CHUNK_MIN = 64 * 1024
+CHUNK_MAX = 4 * 1024 * 1024
+CHUNK_TARGET_SECONDS = 0.25
+DOWNLOAD_RETRIES = 3
+RELEASE_CACHE_FILE = "release_cache.json"
+# Sidecar next to a partial download recording which asset it came from
+PARTIAL_INFO_SUFFIX = ".partial.json"
+
 
 class UpdateManager:
     """
     Manages application updates by checking a GitHub repository for new releases.
     """
 
-    def __init__(self, current_version: str, repo_url: str):
+    def __init__(
+        self,
+        current_version: str,
+        repo_url: str,
+        cache_dir: str = None,
+        min_check_interval: float = 0,
+    ):
         self.current_version = version.parse(current_version)
         self.repo_url = repo_url.replace(
             "https://github.com/", "https://api.github.com/repos/"
@@ -37,19 +54,94 @@ class UpdateManager:
         else:
             self.executable_name = "loteria-gerador-linux"
 
-    def _get_latest_release_data(self):
+        # Release metadata is cached on disk so repeated launches cost at most
+        # one conditional request (a 304 does not count against the rate limit)
+        self.cache_path = (
+            os.path.join(cache_dir, RELEASE_CACHE_FILE) if cache_dir else None
+        )
+        self.min_check_interval = min_check_interval
+        self._session = None
+
+    @property
+    def session(self):
+        """Pooled HTTP session shared by release checks and downloads."""
+        if self._session is None:
+            # requests is imported lazily: it only matters once the window is up
+            import requests
+
+            self._session = requests.Session()
+            self._session.headers["User-Agent"] = (
+                f"loteria-gerador/{self.current_version}"
+            )
+        return self._session
+
+    def _load_release_cache(self):
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_release_cache(self, cache):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = self.cache_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not save release cache: {e}")
+
+    def _get_latest_release_data(self, force: bool = False):
+        import requests
+
+        cache = self._load_release_cache()
+        cached_data = cache.get("data")
+        checked_at = cache.get("checked_at", 0)
+
+        if (
+            not force
+            and cached_data
+            and 0 <= time.time() - checked_at < self.min_check_interval
+        ):
+            logger.info("Using cached release data (checked recently).")
+            return cached_data
+
+        api_url = f"{self.repo_url}/releases/latest"
+        headers = {"Accept": "application/vnd.github+json"}
+        if cached_data and cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+
         try:
-            api_url = f"{self.repo_url}/releases/latest"
             logger.info(f"Checking for updates at: {api_url}")
-            response = requests.get(api_url, timeout=10)
+            response = self.session.get(api_url, headers=headers, timeout=10)
+            if response.status_code == 304:
+                logger.info("Release data not modified.")
+                cache["checked_at"] = time.time()
+                self._save_release_cache(cache)
+                return cached_data
             response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
             logger.error(f"Error fetching latest release data: {e}")
             return {"error": str(e)}
 
-    def check_for_updates(self):
-        release_data = self._get_latest_release_data()
+        self._save_release_cache(
+            {
+                "etag": response.headers.get("ETag"),
+                "checked_at": time.time(),
+                "data": data,
+            }
+        )
+        return data
+
+    def check_for_updates(self, force: bool = False):
+        release_data = self._get_latest_release_data(force)
 
         if release_data.get("error"):
             return {
@@ -63,10 +155,23 @@ class UpdateManager:
         if latest_version > self.current_version:
             logger.info(f"New version found: {latest_version}")
             download_url = None
+            sha256 = None
+            checksum_url = None
+            patch_url = None
+            # Delta from the running version, e.g. "loteria-gerador-linux.1.0.65.bsdiff"
+            patch_name = f"{self.executable_name}.{self.current_version}.bsdiff"
             for asset in release_data.get("assets", []):
-                if self.executable_name in asset.get("name", ""):
+                name = asset.get("name", "")
+                if name == self.executable_name:
                     download_url = asset.get("browser_download_url")
-                    break
+                    # GitHub publishes "sha256:<hex>" for every uploaded asset
+                    digest = asset.get("digest") or ""
+                    if digest.startswith("sha256:"):
+                        sha256 = digest.split(":", 1)[1]
+                elif name == self.executable_name + ".sha256":
+                    checksum_url = asset.get("browser_download_url")
+                elif name == patch_name:
+                    patch_url = asset.get("browser_download_url")
 
             if not download_url:
                 return {
@@ -79,22 +184,230 @@ class UpdateManager:
                 "version": str(latest_version),
                 "notes": release_data.get("body", "No release notes provided."),
                 "download_url": download_url,
+                "sha256": sha256,
+                "checksum_url": checksum_url,
+                "patch_url": patch_url,
             }
         else:
             logger.info("Application is up to date.")
             return {"update_available": False, "error": None}
 
-    def download_and_install(self, download_url: str):
+    def _fetch_checksum(self, checksum_url: str):
+        """Reads the hex digest from a sha256sum-style release asset."""
+        response = self.session.get(checksum_url, timeout=10)
+        response.raise_for_status()
+        return response.text.split()[0].strip().lower()
+
+    def _hash_file(self, path: str):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest
+
+    def _discard_partial(self, target: str):
+        for path in (target, target + PARTIAL_INFO_SUFFIX):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _forget_partial_info(self, target: str):
+        # The download is complete: only the sidecar goes, the file stays
+        if os.path.exists(target + PARTIAL_INFO_SUFFIX):
+            os.remove(target + PARTIAL_INFO_SUFFIX)
+
+    def _load_partial_info(self, target: str):
         try:
-            update_filename = self.current_executable_path + ".new"
-            logger.info(f"Downloading update to {update_filename}")
+            with open(target + PARTIAL_INFO_SUFFIX, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _download(
+        self, download_url: str, target: str, progress_callback=None, resume=True
+    ):
+        """
+        Downloads into target, resuming from its current size with an HTTP
+        Range request. A partial is only resumed if it came from the same URL;
+        If-Range with its validator (ETag or Last-Modified) makes the server
+        send the whole file instead if the asset changed. Returns the SHA-256
+        of the complete file.
+        """
+        offset = os.path.getsize(target) if os.path.exists(target) else 0
+        info = self._load_partial_info(target) if offset else None
+        if offset and (
+            not resume or not info or info.get("url") != download_url
+        ):
+            logger.info("Discarding partial download from another asset.")
+            self._discard_partial(target)
+            offset, info = 0, None
 
-            response = requests.get(download_url, stream=True, timeout=60)
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if info.get("validator"):
+                headers["If-Range"] = info["validator"]
+
+        with self.session.get(
+            download_url, headers=headers, stream=True, timeout=60
+        ) as response:
+            if response.status_code == 416:
+                # Range not satisfiable: the partial file is already complete
+                logger.info("Partial download already complete.")
+                self._forget_partial_info(target)
+                return self._hash_file(target).hexdigest()
             response.raise_for_status()
-            with open(update_filename, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
+
+            if offset and response.status_code == 206:
+                logger.info(f"Resuming download at byte {offset}")
+                digest = self._hash_file(target)
+                mode = "ab"
+            else:
+                # Server ignored the Range header or the asset changed: start over
+                offset = 0
+                digest = hashlib.sha256()
+                mode = "wb"
+                validator = response.headers.get("ETag") or response.headers.get(
+                    "Last-Modified"
+                )
+                with open(target + PARTIAL_INFO_SUFFIX, "w", encoding="utf-8") as f:
+                    json.dump({"url": download_url, "validator": validator}, f)
+
+            length = response.headers.get("Content-Length")
+            total = offset + int(length) if length else None
+            downloaded = offset
+            chunk_size = CHUNK_MIN
+
+            with open(target, mode) as f:
+                while True:
+                    started = time.perf_counter()
+                    chunk = response.raw.read(chunk_size, decode_content=True)
+                    if not chunk:
+                        break
                     f.write(chunk)
+                    digest.update(chunk)
+                    downloaded += len(chunk)
+
+                    elapsed = time.perf_counter() - started
+                    if elapsed < CHUNK_TARGET_SECONDS / 2:
+                        chunk_size = min(CHUNK_MAX, chunk_size * 2)
+                    elif elapsed > CHUNK_TARGET_SECONDS * 2:
+                        chunk_size = max(CHUNK_MIN, chunk_size // 2)
+
+                    if progress_callback:
+                        progress_callback(downloaded, total)
+
+            if total is not None and downloaded != total:
+                raise IOError(f"Incomplete download: {downloaded} of {total} bytes")
+        self._forget_partial_info(target)
+        return digest.hexdigest()
+
+    def _apply_delta(
+        self, patch_url: str, sha256: str, target: str, progress_callback=None
+    ):
+        """
+        Rebuilds the new executable from the running one and a bsdiff patch.
+        Returns True only if the result matches the release SHA-256.
+        """
+        import requests
+        import urllib3
+        from delta import apply_patch, PatchError
+
+        patch_filename = self.current_executable_path + ".patch"
+        try:
+            logger.info(f"Downloading delta patch to {patch_filename}")
+            self._download(patch_url, patch_filename, progress_callback)
+            with open(self.current_executable_path, "rb") as f:
+                old = f.read()
+            with open(patch_filename, "rb") as f:
+                new = apply_patch(old, f.read())
+        except (requests.RequestException, urllib3.exceptions.HTTPError, OSError, PatchError) as e:
+            logger.error(f"Delta update failed: {e}")
+            return False
+        finally:
+            self._discard_partial(patch_filename)
+
+        actual = hashlib.sha256(new).hexdigest()
+        if actual.lower() != sha256.lower():
+            logger.error(f"Patched file checksum mismatch: expected {sha256}, got {actual}")
+            return False
+
+        with open(target, "wb") as f:
+            f.write(new)
+        logger.info("Delta update applied.")
+        return True
+
+    def download_update(
+        self,
+        download_url: str,
+        sha256: str = None,
+        checksum_url: str = None,
+        progress_callback=None,
+        patch_url: str = None,
+    ):
+        """
+        Downloads the update to "<executable>.new", retrying with resume on
+        network errors and verifying the SHA-256 when the release publishes it.
+        A delta patch for the running version is tried first; any failure
+        falls back to the full asset. Returns the path of the verified file,
+        or None on failure.
+        """
+        import requests
+        import urllib3
+
+        update_filename = self.current_executable_path + ".new"
+        if not sha256 and checksum_url:
+            try:
+                sha256 = self._fetch_checksum(checksum_url)
+            except requests.RequestException as e:
+                logger.error(f"Could not fetch checksum: {e}")
+                return None
+        if not sha256:
+            logger.warning("Release has no published SHA-256; skipping verification.")
+            # Without a checksum a resumed file could not be verified: start clean
+            self._discard_partial(update_filename)
+
+        # A patched file can only be trusted if there is a checksum to verify it
+        if patch_url and sha256:
+            if self._apply_delta(patch_url, sha256, update_filename, progress_callback):
+                return update_filename
+            logger.info("Falling back to the full download.")
+
+        for attempt in range(1, DOWNLOAD_RETRIES + 1):
+            try:
+                logger.info(f"Downloading update to {update_filename} (attempt {attempt})")
+                actual = self._download(
+                    download_url, update_filename, progress_callback, resume=bool(sha256)
+                )
+            except (requests.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+                # The partial file is kept so the next attempt can resume
+                logger.error(f"Download interrupted: {e}")
+                continue
+
+            if sha256 and actual.lower() != sha256.lower():
+                # Possibly a stale partial from another release: drop the file
+                # and its sidecar and start over instead of rehashing the same bytes
+                logger.error(f"Checksum mismatch: expected {sha256}, got {actual}")
+                self._discard_partial(update_filename)
+                continue
+
             logger.info("Download complete.")
+            return update_filename
+        return None
+
+    def download_and_install(
+        self,
+        download_url: str,
+        sha256: str = None,
+        checksum_url: str = None,
+        progress_callback=None,
+        patch_url: str = None,
+    ):
+        try:
+            update_filename = self.download_update(
+                download_url, sha256, checksum_url, progress_callback, patch_url
+            )
+            if not update_filename:
+                return False
 
             # --- CRIAÇÃO DOS SCRIPTS COM CAMINHOS ABSOLUTOS ---
             if self.platform == "windows":
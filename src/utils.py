@@ -10,3 +10,59 @@ def get_resource_path(relative_path):
     else:
         # Script: arquivos estão no diretório do projeto
         return os.path.join(os.path.dirname(__file__), relative_path)
+
+
+class PerfilImportacao:
+    """
+    Mede o tempo de cada import (no estilo do `python -X importtime`)
+    substituindo temporariamente o builtins.__import__.
+    """
+
+    def __init__(self):
+        import builtins
+        import time
+
+        self._builtins = builtins
+        self._relogio = time.perf_counter
+        self._original = builtins.__import__
+        self.inicio = self._relogio()
+        self.registros = []  # (nome, profundidade, tempo próprio, tempo acumulado)
+        self._pilha = []
+
+    def _importar(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and name in sys.modules and not fromlist:
+            return self._original(name, globals, locals, fromlist, level)
+
+        antes = len(sys.modules)
+        self._pilha.append(0.0)
+        t0 = self._relogio()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            total = self._relogio() - t0
+            filhos = self._pilha.pop()
+            if self._pilha:
+                self._pilha[-1] += total
+            # Só registra imports que realmente carregaram módulos novos
+            if len(sys.modules) > antes:
+                self.registros.append(
+                    (name, len(self._pilha), total - filhos, total)
+                )
+
+    def iniciar(self):
+        self._builtins.__import__ = self._importar
+        return self
+
+    def parar(self):
+        self._builtins.__import__ = self._original
+
+    def registrar(self, logger, etapa="primeira janela"):
+        """Escreve no log o tempo de cada import e o tempo até a etapa informada"""
+        self.parar()
+        logger.info("Perfil de importação (próprio us | acumulado us | módulo)")
+        for nome, profundidade, proprio, acumulado in self.registros:
+            logger.info(
+                f"import time: {proprio * 1e6:9.0f} | {acumulado * 1e6:10.0f} | "
+                f"{'  ' * profundidade}{nome}"
+            )
+        logger.info(f"Tempo até {etapa}: {(self._relogio() - self.inicio) * 1000:.0f} ms")
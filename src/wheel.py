@@ -0,0 +1,169 @@
+"""
+Desdobramentos: poucos jogos que, juntos, garantem um prêmio mínimo.
+
+Dado um pote de v dezenas, jogos de k dezenas e a garantia "se m das
+dezenas do pote forem sorteadas, algum jogo acerta pelo menos t", o
+desdobramento é uma cobertura: todo subconjunto de m dezenas do pote
+precisa ter t ou mais dezenas em comum com algum jogo.
+
+Jogos e subconjuntos são máscaras de v bits numeradas pelo sistema
+combinatório (rank colex); em potes pequenos, uma tabela de 2^v posições
+troca o cálculo do rank por uma consulta. As tabelas de vizinhos (quem
+cobre quem) são montadas de uma vez com NumPy, e o set cover guloso só faz
+argmax e bincount sobre elas.
+"""
+
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from config import LOTTERY_CONFIG
+from pricing import calcular_preco
+
+# Limite de entradas nas tabelas de vizinhos (int32): cerca de 200 MB
+LIMITE_ENTRADAS = 50_000_000
+# Até este tamanho de pote o rank vem de uma tabela de 2^v int32 (16 MB)
+BITS_TABELA = 22
+
+
+def _binomiais(v):
+    """Tabela B[n, r] = comb(n, r), para n < v e r <= v"""
+    return np.array([[comb(n, r) for r in range(v + 1)] for n in range(v)], dtype=np.int64)
+
+
+def _rank(mascaras, v, binomiais):
+    """Posição de cada máscara entre as de mesma quantidade de bits (ordem colex)"""
+    mascaras = np.asarray(mascaras, dtype=np.int64)
+    rank = np.zeros(mascaras.shape, dtype=np.int64)
+    contagem = np.zeros(mascaras.shape, dtype=np.int64)
+    for p in range(v):
+        bit = (mascaras >> p) & 1
+        contagem += bit
+        rank += bit * binomiais[p, contagem]
+    return rank
+
+
+def _combinacoes(n, r):
+    """Matriz (comb(n, r), r) com as combinações de range(n)"""
+    return np.array(list(combinations(range(n), r)), dtype=np.int64).reshape(comb(n, r), r)
+
+
+def _todas(v, k, binomiais):
+    """Todas as máscaras de k bits em v, indexadas pelo próprio rank"""
+    pesos = 1 << np.arange(v, dtype=np.int64)
+    indices = _combinacoes(v, k)
+    mascaras = pesos[indices].sum(axis=1)
+    saida = np.empty_like(mascaras)
+    saida[_rank(mascaras, v, binomiais)] = mascaras
+    return saida
+
+
+def _grau(v, k, m, t):
+    """Quantos subconjuntos de m bits têm pelo menos t bits em comum com um de k"""
+    return sum(comb(k, j) * comb(v - k, m - j) for j in range(t, min(k, m) + 1))
+
+
+def _vizinhos(origens, v, k, m, t, indexar):
+    """
+    Para cada máscara de k bits, os ranks de todas as máscaras de m bits com
+    pelo menos t bits em comum: tira k - j bits de dentro e põe m - j de fora.
+    """
+    n = len(origens)
+    bits = (origens[:, None] >> np.arange(v, dtype=np.int64)) & 1
+    pesos = 1 << np.arange(v, dtype=np.int64)
+    dentro = pesos[np.nonzero(bits)[1].reshape(n, k)]
+    fora = pesos[np.nonzero(1 - bits)[1].reshape(n, v - k)]
+
+    partes = []
+    for j in range(t, min(k, m) + 1):
+        if m - j > v - k:
+            continue
+        tira = _combinacoes(k, k - j)
+        poe = _combinacoes(v - k, m - j)
+        menos = dentro[:, tira].sum(axis=2)
+        mais = fora[:, poe].sum(axis=2)
+        alvos = origens[:, None, None] - menos[:, :, None] + mais[:, None, :]
+        partes.append(indexar(alvos.reshape(n, -1)).astype(np.int32))
+    return np.concatenate(partes, axis=1)
+
+
+def desdobrar(dezenas, k, garantia, condicao):
+    """
+    Jogos de k dezenas que garantem `garantia` acertos em algum jogo sempre
+    que `condicao` das dezenas informadas forem sorteadas. Retorna uma matriz
+    (n, k) uint8 com cada linha ordenada.
+    """
+    pote = np.unique(np.asarray(dezenas, dtype=np.int64))
+    v = len(pote)
+    if not 0 < k <= v:
+        raise ValueError(f"Jogos de {k} dezenas não cabem em um pote de {v}")
+    if not 0 < condicao <= v:
+        raise ValueError(f"A condição ({condicao}) deve estar entre 1 e {v}")
+    if not 0 < garantia <= min(k, condicao):
+        raise ValueError(
+            f"A garantia ({garantia}) deve estar entre 1 e {min(k, condicao)}"
+        )
+    if v > 62:
+        raise ValueError("O pote pode ter no máximo 62 dezenas")
+
+    num_jogos = comb(v, k)
+    num_condicoes = comb(v, condicao)
+    entradas = num_jogos * _grau(v, k, condicao, garantia)
+    if k != condicao:
+        entradas += num_condicoes * _grau(v, condicao, k, garantia)
+    if entradas > LIMITE_ENTRADAS:
+        raise ValueError(
+            "Desdobramento grande demais: diminua o pote ou aumente a garantia"
+        )
+
+    binomiais = _binomiais(v)
+    jogos = _todas(v, k, binomiais)
+    condicoes = jogos if k == condicao else _todas(v, condicao, binomiais)
+    if v <= BITS_TABELA:
+        # Máscaras com quantidades de bits diferentes não colidem na tabela
+        tabela = np.zeros(1 << v, dtype=np.int32)
+        tabela[jogos] = np.arange(num_jogos, dtype=np.int32)
+        tabela[condicoes] = np.arange(num_condicoes, dtype=np.int32)
+        indexar = tabela.__getitem__
+    else:
+        indexar = lambda mascaras: _rank(mascaras, v, binomiais)
+
+    # cobre[i]: condições cobertas pelo jogo i; coberta_por[c]: jogos que cobrem c
+    cobre = _vizinhos(jogos, v, k, condicao, garantia, indexar)
+    if k == condicao:
+        coberta_por = cobre
+    else:
+        coberta_por = _vizinhos(condicoes, v, condicao, k, garantia, indexar)
+
+    ganho = np.full(num_jogos, cobre.shape[1], dtype=np.int64)
+    coberta = np.zeros(num_condicoes, dtype=bool)
+    restantes = num_condicoes
+    escolhidos = []
+    while restantes:
+        melhor = int(np.argmax(ganho))
+        vizinhas = cobre[melhor]
+        novas = vizinhas[~coberta[vizinhas]]
+        coberta[novas] = True
+        restantes -= len(novas)
+        # Cada jogo perde uma unidade de ganho por condição que acabou de ser coberta
+        ganho -= np.bincount(coberta_por[novas].ravel(), minlength=num_jogos)
+        escolhidos.append(melhor)
+
+    bits = (jogos[escolhidos][:, None] >> np.arange(v, dtype=np.int64)) & 1
+    indices = np.nonzero(bits)[1].reshape(len(escolhidos), k)
+    return pote[indices].astype(np.uint8)
+
+
+def custo_desdobramento(loteria, jogos, tamanho_pote):
+    """Custo total dos jogos e, para comparar, o de apostar o pote inteiro num jogo só"""
+    config = LOTTERY_CONFIG[loteria]
+    jogos = np.asarray(jogos)
+    custo = len(jogos) * calcular_preco(loteria, jogos.shape[1])
+    v = tamanho_pote
+    custo_pote = (
+        calcular_preco(loteria, v)
+        if config["min_dezenas"] <= v <= config["max_dezenas"]
+        else comb(v, config["min_dezenas"]) * config["preco_base"]
+    )
+    return custo, custo_pote